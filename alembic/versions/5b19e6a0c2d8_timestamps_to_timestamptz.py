@@ -0,0 +1,69 @@
+"""timestamps_to_timestamptz
+
+Revision ID: 5b19e6a0c2d8
+Revises: 3d5a8c0e7f42
+Create Date: 2026-10-16 10:48:13.062975
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b19e6a0c2d8'
+down_revision: Union[str, None] = '3d5a8c0e7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Existing values were written with datetime.utcnow(), so interpret them as UTC.
+# Some of these tables (portfolio_*, ref_account_types) are created via create_all
+# rather than migrations, so only touch tables that actually exist.
+TIMESTAMP_COLUMNS = {
+    'users': ['created_at'],
+    'activities': ['date'],
+    'multi_step_form_progress': ['last_updated'],
+    'user_goals': ['created_at', 'updated_at'],
+    'user_action_items': ['created_at', 'updated_at'],
+    'user_milestones': ['created_at'],
+    'ref_milestones': ['created_at', 'updated_at'],
+    'ref_account_types': ['created_at'],
+    'ref_funds': ['created_at'],
+    'portfolio_accounts': ['created_at', 'updated_at'],
+    'portfolio_allocations': ['created_at', 'updated_at'],
+    'portfolio_holdings': ['created_at', 'updated_at'],
+    'retirement_plans': ['created_at', 'updated_at'],
+    'annual_snapshots': ['created_at'],
+    'roth_conversion_plans': ['created_at', 'updated_at'],
+    'roth_conversion_scenarios': ['created_at'],
+}
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        if table not in existing:
+            continue
+        for column in columns:
+            op.alter_column(table, column,
+                       existing_type=sa.DateTime(),
+                       type_=sa.DateTime(timezone=True),
+                       postgresql_using=f"\"{column}\" AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    existing = _existing_tables()
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        if table not in existing:
+            continue
+        for column in columns:
+            op.alter_column(table, column,
+                       existing_type=sa.DateTime(timezone=True),
+                       type_=sa.DateTime(),
+                       postgresql_using=f"\"{column}\" AT TIME ZONE 'UTC'")
@@ -0,0 +1,79 @@
+"""roth_scenarios_to_jsonb
+
+Revision ID: 9a4f2b7d1e60
+Revises: 5b19e6a0c2d8
+Create Date: 2026-10-16 11:20:44.718350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2b7d1e60'
+down_revision: Union[str, None] = '5b19e6a0c2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('roth_conversion_plans', sa.Column('scenarios', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # Fold the existing per-year rows into the plan before dropping the child table
+    op.execute("""
+        UPDATE roth_conversion_plans p
+        SET scenarios = s.rows
+        FROM (
+            SELECT plan_id, jsonb_agg(jsonb_build_object(
+                'year', year,
+                'age', age,
+                'conversionAmount', conversion_amount,
+                'taxCost', tax_cost,
+                'traditionalBalance', traditional_balance,
+                'rothBalance', roth_balance,
+                'totalTaxPaid', total_tax_paid,
+                'netWorth', net_worth
+            ) ORDER BY year) AS rows
+            FROM roth_conversion_scenarios
+            GROUP BY plan_id
+        ) s
+        WHERE s.plan_id = p.id
+    """)
+
+    op.drop_table('roth_conversion_scenarios')
+
+
+def downgrade() -> None:
+    op.create_table('roth_conversion_scenarios',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('plan_id', sa.UUID(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('conversion_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('tax_cost', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('traditional_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('roth_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('total_tax_paid', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('net_worth', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['plan_id'], ['roth_conversion_plans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute("""
+        INSERT INTO roth_conversion_scenarios
+            (id, plan_id, year, age, conversion_amount, tax_cost, traditional_balance,
+             roth_balance, total_tax_paid, net_worth, created_at)
+        SELECT gen_random_uuid(), p.id,
+               (e->>'year')::int, (e->>'age')::int,
+               (e->>'conversionAmount')::numeric, (e->>'taxCost')::numeric,
+               (e->>'traditionalBalance')::numeric, (e->>'rothBalance')::numeric,
+               (e->>'totalTaxPaid')::numeric, (e->>'netWorth')::numeric,
+               p.updated_at
+        FROM roth_conversion_plans p, jsonb_array_elements(p.scenarios) e
+        WHERE p.scenarios IS NOT NULL
+    """)
+
+    op.drop_column('roth_conversion_plans', 'scenarios')
@@ -0,0 +1,55 @@
+"""json_columns_to_jsonb
+
+Revision ID: b6d3f1a8e925
+Revises: 9a4f2b7d1e60
+Create Date: 2026-10-16 12:05:37.418206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d3f1a8e925'
+down_revision: Union[str, None] = '9a4f2b7d1e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Last columns still stored as plain json. These tables are created via create_all,
+# so only touch the ones that actually exist.
+JSON_COLUMNS = {
+    'activities': ['metadata'],
+    'multi_step_form_progress': ['completed_steps', 'form_data'],
+}
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+    for table, columns in JSON_COLUMNS.items():
+        if table not in existing:
+            continue
+        for column in columns:
+            op.alter_column(table, column,
+                       existing_type=sa.JSON(),
+                       type_=postgresql.JSONB(astext_type=sa.Text()),
+                       postgresql_using=f"\"{column}\"::jsonb")
+
+
+def downgrade() -> None:
+    existing = _existing_tables()
+    for table, columns in JSON_COLUMNS.items():
+        if table not in existing:
+            continue
+        for column in columns:
+            op.alter_column(table, column,
+                       existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                       type_=sa.JSON(),
+                       postgresql_using=f"\"{column}\"::json")
@@ -87,19 +87,25 @@ async def get_users_list(
     # Get total count for pagination
     total = await db.scalar(select(func.count(User.id))) or 0
     
+    # Plan counts for the whole page in one grouped query instead of one per user
+    plan_counts = {}
+    if users:
+        p_stmt = (
+            select(RetirementPlan.userId, func.count(RetirementPlan.id))
+            .where(col(RetirementPlan.userId).in_([u.id for u in users]))
+            .group_by(RetirementPlan.userId)
+        )
+        plan_counts = dict((await db.execute(p_stmt)).all())
+    
     user_summaries = []
     
     for user in users:
-        # Get Plan Count for this user
-        p_stmt = select(func.count(RetirementPlan.id)).where(RetirementPlan.userId == user.id)
-        p_count = await db.scalar(p_stmt) or 0
-        
         user_summaries.append({
             "id": str(user.id),
             "email": user.email,
             "role": user.role,
             "createdAt": user.createdAt,
-            "planCount": p_count,
+            "planCount": plan_counts.get(user.id, 0),
             "isActive": True # Placeholder, could be based on last login
         })
         
@@ -12,10 +12,6 @@ from app.models.user import User, UserRead
 
 router = APIRouter()
 
-# --- Google Auth Imports ---
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-
 class GoogleLoginRequest(BaseModel):
     token: str
 
@@ -159,6 +155,11 @@ async def google_login(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     # 1. Verify Google Token
+    # google-auth (and the requests stack under it) is only needed here, so import it on
+    # first use instead of at worker startup
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+
     try:
         # We don't check audience here because we want to allow any valid token for this demo/setup. 
         # In prod, pass CLIENT_ID as second arg.
@@ -10,7 +10,6 @@ from app.api import deps
 from app.database import get_db
 from app.models.user import User
 from app.models.retirement import RetirementPlan, AnnualSnapshot
-from app.models.goal import UserGoal
 from app.services.recommendation_engine import RecommendationEngine
 from app.services.retirement_service import RetirementService
 
@@ -163,69 +162,14 @@ async def get_dashboard(
              hit_year = None
              
     # Prepare Portfolio Breakdown
-    # Cash: Savings + Checking
-    cash_val = get_asset("savingsBalance") + get_asset("checkingBalance")
-    real_estate_val = get_asset("realEstateValue")
-    investments_val = float(portfolio_total) - cash_val # Removed real_estate_val subtraction as portfolio_total doesn't include it
-    
-    # 60/40 Split for investments as placeholder
-    stocks_val = investments_val * 0.6
-    bonds_val = investments_val * 0.4
-    
-    def pct(val, tot):
-        return int((val / tot * 100)) if tot > 0 else 0
-        
-    portfolio_allocation = {
-        "total": float(portfolio_total) + real_estate_val, # Add real estate here for total allocation view? Or keep consistent? User said "Progress... do not include house equity". Allocation might want it.
-        # Line 117-124 showed breakdown. If I change portfolio_total meaning there, it affects frontend.
-        # Previous code: portfolio_allocation["total"] = portfolio_total.
-        # And categories included realEstate.
-        # But portfolio_total sum at line 55 didn't include realEstate.
-        # So pct(real_estate_val, portfolio_total) was likely calculating % of LIQUID assets, which is weird if real_estate > liquid.
-        # Or real_estate_val was treated as separate?
-        # Line 121: "percentage": pct(real_estate_val, float(portfolio_total)).
-        # If portfolio_total = 100k liquid, and House = 500k. Pct = 500%.
-        # The previous code was likely buggy or assuming definitions I'm correcting.
-        # I'll update portfolio_allocation["total"] to be Liquid + RealEstate for the PIE CHART correctness, 
-        # but keep "current_amount" for Progress as Liquid Only.
-        "categories": {
-            "stocks": {"percentage": pct(stocks_val, float(portfolio_total) + real_estate_val), "value": stocks_val},
-            "bonds": {"percentage": pct(bonds_val, float(portfolio_total) + real_estate_val), "value": bonds_val},
-            "realEstate": {"percentage": pct(real_estate_val, float(portfolio_total) + real_estate_val), "value": real_estate_val},
-            "cash": {"percentage": pct(cash_val, float(portfolio_total) + real_estate_val), "value": cash_val}
-        }
-    }
-    
-    # Fix total update
-    portfolio_allocation["total"] = float(portfolio_total) + real_estate_val
+    # Total includes real estate for the pie chart; progress above stays liquid-only
+    portfolio_allocation = RecommendationEngine.portfolio_allocation(current_user)
 
-
-
-    # Fetch User Active Goals Titles for filtering recommendations
-    # Simple select of user goal titles
-    goals_stmt = (
-        select(UserGoal.title)
-        .where(UserGoal.userId == current_user.id)
-    )
-    goals_res = await db.execute(goals_stmt)
-    active_goal_titles = goals_res.scalars().all()
-
-    # Fetch User Active Action Titles
-    from app.models.action_item import UserActionItem
-    actions_stmt = (
-        select(UserActionItem.title)
-        .where(UserActionItem.user_id == current_user.id)
-        # We might want to filter by status='todo' or just existence depending on "if user deletes it comes back" logic.
-        # User said: "bring it back if the user deletes the goal".
-        # This implies existence check regardless of status, OR if status is DONE it might still be considered "handled".
-        # But if they delete the action item, it's gone from DB.
-        # So we just check existence in the table.
-    )
-    actions_res = await db.execute(actions_stmt)
-    active_action_titles = actions_res.scalars().all()
+    # Existing goal/action titles suppress matching recommendations
+    active_goal_titles, active_action_titles = await RecommendationEngine.load_titles(db, current_user.id)
 
     # Generate Recommendations
-    recommendations = RecommendationEngine.generate_recommendations(
+    recommendations = await RecommendationEngine.generate_recommendations(
         current_user, 
         plan, 
         portfolio_allocation, 
@@ -52,3 +52,14 @@ async def get_current_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+def get_ref_cache(request: Request) -> dict:
+    """
+    Per-request cache for reference table rows (RefAccountType, RefFund, ...).
+    Lives on request.state so every dependency/handler in the request shares it.
+    """
+    cache = getattr(request.state, "ref_cache", None)
+    if cache is None:
+        cache = {}
+        request.state.ref_cache = cache
+    return cache
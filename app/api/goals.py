@@ -10,7 +10,7 @@ from app.api import deps
 from app.database import get_db
 from app.models.user import User
 from app.models.goal import UserGoal
-from app.services.goal_calculator import GoalCalculator
+from app.services.goal_calculator import GoalCalculator, GoalType
 
 router = APIRouter()
 
@@ -108,11 +108,9 @@ async def create_user_goal(
     initial_target = goal_in.targetValue or 0.0
     
     if goal_in.goalTypeHint:
-        # Use simple string matching in calculator if we adapt it, 
-        # OR just use logic here if Calculator isn't updated yet.
-        # Let's try to trust the Calculator if it supports strings.
+        # Resolve the hint to a GoalType once; unknown hints fall through to the calculator defaults
         try:
-             calc = GoalCalculator.calculate_initial_values(current_user, goal_in.goalTypeHint)
+             calc = GoalCalculator.calculate_initial_values(current_user, GoalType.classify(goal_in.goalTypeHint))
              if not initial_current and calc.get("currentValue", 0) > 0:
                  initial_current = calc["currentValue"]
              if not initial_target and calc.get("targetValue", 0) > 0:
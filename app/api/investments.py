@@ -1,13 +1,15 @@
 from typing import List, Any
 from uuid import UUID
 from decimal import Decimal
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api import deps
-from app.models import User, InvestmentAccount, SecurityHolding, RefFund, InvestmentAccountRead, InvestmentAccountUpdate, InvestmentAccountCreate
+from app.services.reference_data import ReferenceDataService
+from app.models import User, InvestmentAccount, SecurityHolding, RefFund, RefAccountType, InvestmentAccountRead, InvestmentAccountListItem, InvestmentAccountUpdate, InvestmentAccountCreate
 
 router = APIRouter()
 
@@ -67,35 +69,12 @@ async def seed_funds(db: AsyncSession):
 
 # --- INVESTMENT ACCOUNTS ---
 
-from datetime import datetime
-from decimal import Decimal
-from typing import List
-from uuid import UUID
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-
-from app.api import deps
-from app.models.user import User
-from app.models.investment import (
-    InvestmentAccount,
-    InvestmentAccountRead,
-    InvestmentAccountUpdate,
-    SecurityHolding,
-    RefFund,
-    RefAccountType
-)
-from uuid import uuid4
-
-
-
 @router.get("/users/{user_id}/investment-accounts", response_model=List[InvestmentAccountRead])
 async def get_user_investment_accounts(
     user_id: UUID,
     current_user: User = Depends(deps.get_current_user),
     db: AsyncSession = Depends(deps.get_db),
+    ref_cache: dict = Depends(deps.get_ref_cache),
 ):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
@@ -103,7 +82,7 @@ async def get_user_investment_accounts(
     # Fetch existing DB accounts with holdings and type reference
     query = select(InvestmentAccount)\
         .where(InvestmentAccount.userId == user_id)\
-        .options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef))
+        .options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef).load_only(RefAccountType.name, RefAccountType.code))
     
     result = await db.execute(query)
     db_accounts = result.scalars().all()
@@ -113,11 +92,7 @@ async def get_user_investment_accounts(
     
     # Populate Metadata (Name, Class, Region) dynamically from RefFund
     # Also fetch all funds map once
-    funds = []
-    if db_accounts:
-        funds_res = await db.execute(select(RefFund))
-        funds = funds_res.scalars().all()
-    fund_map = {f.ticker.upper(): f for f in funds}
+    fund_map = await ReferenceDataService.get_fund_map(db, ref_cache) if db_accounts else {}
 
 
     for account in db_accounts:
@@ -152,11 +127,39 @@ async def get_user_investment_accounts(
 
     return response_accounts
 
+@router.get("/users/{user_id}/investment-accounts/summary", response_model=List[InvestmentAccountListItem])
+async def get_user_investment_account_summary(
+    user_id: UUID,
+    current_user: User = Depends(deps.get_current_user),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Lightweight account list (no holdings) - just the columns a picker/summary needs,
+    selected directly instead of hydrating accounts + holdings + fund metadata.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    query = select(
+            InvestmentAccount.id,
+            RefAccountType.name.label("accountName"),
+            RefAccountType.code.label("accountType"),
+            InvestmentAccount.accountOwner,
+            InvestmentAccount.balance,
+        )\
+        .join(RefAccountType, InvestmentAccount.typeId == RefAccountType.id)\
+        .where(InvestmentAccount.userId == user_id)\
+        .order_by(InvestmentAccount.createdAt)
+
+    result = await db.execute(query)
+    return [InvestmentAccountListItem.model_validate(dict(row)) for row in result.mappings().all()]
+
 @router.post("/investment-accounts", response_model=InvestmentAccountRead)
 async def create_investment_account(
-    account_in: "InvestmentAccountCreate", # Use string ref or import
+    account_in: InvestmentAccountCreate,
     current_user: User = Depends(deps.get_current_user),
     db: AsyncSession = Depends(deps.get_db),
+    ref_cache: dict = Depends(deps.get_ref_cache),
 ):
 
     
@@ -164,23 +167,8 @@ async def create_investment_account(
     # Normalize input
     code = account_in.accountType.lower() if account_in.accountType else "other"
     
-    # Try exact match first, then lower
-    res = await db.execute(select(RefAccountType).where(RefAccountType.code == account_in.accountType))
-    ref_type = res.scalars().first()
-    
-    if not ref_type:
-         # Try case insensitive
-         res = await db.execute(select(RefAccountType).where(RefAccountType.code == code))
-         ref_type = res.scalars().first()
-         
-    if not ref_type:
-        # Fallback to 'brokerage' (commonly available) or 'other'
-        res = await db.execute(select(RefAccountType).where(RefAccountType.code == "brokerage"))
-        ref_type = res.scalars().first()
-        
-    if not ref_type:
-         res = await db.execute(select(RefAccountType).where(RefAccountType.code == "other"))
-         ref_type = res.scalars().first()
+    # Try exact match first, then lower, then fallback to 'brokerage' (commonly available) or 'other'
+    ref_type = await ReferenceDataService.get_account_type(db, ref_cache, account_in.accountType, code, "brokerage", "other")
          
     if not ref_type:
         raise HTTPException(status_code=400, detail=f"Invalid account type: {account_in.accountType} and 'other' fallback missing.")
@@ -200,7 +188,7 @@ async def create_investment_account(
     
     # Re-fetch with holdings/ref for Read Model
     query = select(InvestmentAccount).where(InvestmentAccount.id == account.id)\
-        .options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef))
+        .options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef).load_only(RefAccountType.name, RefAccountType.code))
     result = await db.execute(query)
     saved_account = result.scalars().first()
     
@@ -230,7 +218,7 @@ async def update_investment_account(
     db: AsyncSession = Depends(deps.get_db),
 ):
     # Fetch account with holdings to verify ownership and update balance logic
-    query = select(InvestmentAccount).where(InvestmentAccount.id == account_id).options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef))
+    query = select(InvestmentAccount).where(InvestmentAccount.id == account_id).options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef).load_only(RefAccountType.name, RefAccountType.code))
     result = await db.execute(query)
     account = result.scalars().first()
     
@@ -300,7 +288,7 @@ async def update_investment_account(
     if 'contributionAmount' in update_data:
          account.contributionAmount = update_data['contributionAmount']
 
-    account.updatedAt = datetime.utcnow()
+    account.updatedAt = datetime.now(timezone.utc)
     db.add(account)
     await db.commit()
     await db.refresh(account)
@@ -330,7 +318,7 @@ async def reset_investment_account(
     db: AsyncSession = Depends(deps.get_db),
 ):
     # Fetch account to verify ownership
-    query = select(InvestmentAccount).where(InvestmentAccount.id == account_id).options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef))
+    query = select(InvestmentAccount).where(InvestmentAccount.id == account_id).options(selectinload(InvestmentAccount.holdings), selectinload(InvestmentAccount.accountTypeRef).load_only(RefAccountType.name, RefAccountType.code))
     result = await db.execute(query)
     account = result.scalars().first()
     
@@ -351,7 +339,7 @@ async def reset_investment_account(
     account.contributionAmount = Decimal(0) 
     account.holdings = [] # Clear relationship in memory
     
-    account.updatedAt = datetime.utcnow()
+    account.updatedAt = datetime.now(timezone.utc)
     db.add(account)
     await db.commit()
     await db.refresh(account)
@@ -406,7 +394,7 @@ async def extract_portfolio_from_document(
     from app.services.ai_service import AIService
     
     content = await file.read()
-    result = AIService.extract_portfolio_from_file(
+    result = await AIService.extract_portfolio_from_file(
         file_content=content,
         mime_type=file.content_type,
         user_id=str(current_user.id)
@@ -424,6 +412,7 @@ async def create_security_holding(
     holding: SecurityHolding,
     current_user: User = Depends(deps.get_current_user),
     db: AsyncSession = Depends(deps.get_db),
+    ref_cache: dict = Depends(deps.get_ref_cache),
 ):
     # Verify account ownership
     query = select(InvestmentAccount).where(InvestmentAccount.id == holding.accountId)
@@ -468,8 +457,7 @@ async def create_security_holding(
     
     # Populate Metadata from RefFund for Response (Not creating DB dependency for now)
     if holding.ticker:
-        f_res = await db.execute(select(RefFund).where(RefFund.ticker == holding.ticker))
-        fund = f_res.scalars().first()
+        fund = await ReferenceDataService.get_fund(db, ref_cache, holding.ticker)
         if fund:
             holding.name = fund.name
             holding.assetClass = fund.assetClass
@@ -1,9 +1,9 @@
 from typing import List, Any, Optional
 from uuid import UUID
-from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
 
@@ -11,12 +11,20 @@ from app.api import deps
 from app.models import User, RetirementPlan, AnnualSnapshot, UserMilestone
 from app.models.retirement import AnnualSnapshotRead
 from app.services.retirement_service import RetirementService
-from app.models.goal import UserGoal
-from app.models.action_item import UserActionItem
+from app.services.user_service import UserService
 from app.services.recommendation_engine import RecommendationEngine
 
 router = APIRouter()
 
+# Hot read statements, built once at import so each request only binds plan_id
+# (and hits the compiled cache / asyncpg prepared statement directly)
+# Snapshots are selected as plain columns (only what AnnualSnapshotRead needs),
+# so we skip hydrating full ORM instances just to model_dump() them again.
+SNAPSHOTS_BY_PLAN = select(
+    *(getattr(AnnualSnapshot, f).label(f) for f in AnnualSnapshotRead.model_fields)
+).where(AnnualSnapshot.planId == bindparam("plan_id")).order_by(AnnualSnapshot.year)
+MILESTONES_BY_PLAN = select(UserMilestone).where(UserMilestone.planId == bindparam("plan_id"))
+
 @router.get("", response_model=List[RetirementPlan])
 async def get_retirement_plans(
     current_user: User = Depends(deps.get_current_user),
@@ -96,41 +104,18 @@ async def update_retirement_plan(
 
     if plan.planType == 'P':
         # Update User Profile for Primary Plan
-        user_updated = False
-        
-        # We need to manually mark JSON fields as modified if we mutate them in place, 
-        # or we re-assign the whole dict. Re-assigning is safer.
-        # Let's clone current dicts to be safe
-        u_personal = dict(current_user.personal_info or {})
-        u_risk = dict(current_user.risk or {})
-        u_income = dict(current_user.income or {})
-        u_expenses = dict(current_user.expenses or {})
-        
-        # Helper to get the right dict ref
-        def get_dict_ref(col):
-            if col == "personal_info": return u_personal
-            if col == "risk": return u_risk
-            if col == "income": return u_income
-            if col == "expenses": return u_expenses
-            return None
+        # Collect only the changed keys per bucket and merge them in the DB
+        user_patches = {}
 
         for key, value in plan_update.items():
             if key in user_field_map:
                 col_name, json_key = user_field_map[key]
-                d = get_dict_ref(col_name)
-                if d is not None:
-                    d[json_key] = value
-                    user_updated = True
+                user_patches.setdefault(col_name, {})[json_key] = value
             elif hasattr(plan, key):
                 # Allow updating native plan fields like planName, startAge, endAge
                 setattr(plan, key, value)
         
-        if user_updated:
-            current_user.personal_info = u_personal
-            current_user.risk = u_risk
-            current_user.income = u_income
-            current_user.expenses = u_expenses
-            db.add(current_user)
+        await UserService.merge_profile(db, current_user, user_patches)
             
     else:
         # Update Overrides for Variant Plan
@@ -186,13 +171,11 @@ async def get_full_retirement_plan(
         raise HTTPException(status_code=403, detail="Not authorized")
         
     # Snapshots
-    stmt = select(AnnualSnapshot).where(AnnualSnapshot.planId == plan_id).order_by(AnnualSnapshot.year)
-    result_s = await db.execute(stmt)
-    snapshots = result_s.scalars().all()
+    result_s = await db.execute(SNAPSHOTS_BY_PLAN, {"plan_id": plan_id})
+    snapshots = result_s.mappings().all()
     
     # Milestones
-    stmt_m = select(UserMilestone).where(UserMilestone.planId == plan_id)
-    result_m = await db.execute(stmt_m)
+    result_m = await db.execute(MILESTONES_BY_PLAN, {"plan_id": plan_id})
     milestones = result_m.scalars().all()
     
     response = plan.model_dump()
@@ -219,7 +202,7 @@ async def get_full_retirement_plan(
         
     response.update(ui_resolved)
     
-    response["snapshots"] = [AnnualSnapshotRead.model_validate(s.model_dump()) for s in snapshots]
+    response["snapshots"] = [AnnualSnapshotRead.model_validate(dict(s)) for s in snapshots]
     response["milestones"] = milestones
     return response
 
@@ -246,37 +229,33 @@ async def generate_primary_plan(
     # 2. Update User Profile from FormData (if provided)
     form_data = request.get("formData", {})
     
-    def safe_decimal(val, default):
-        if val == "" or val is None: return Decimal(str(default))
-        try: return Decimal(str(val))
-        except: return Decimal(str(default))
+    # Plain floats: these land in the JSONB buckets and feed straight into the projection math
+    def safe_float(val, default):
+        if val == "" or val is None: return float(default)
+        try: return float(val)
+        except: return float(default)
 
     # Update User attributes if present in form_data
     # This ensures the Primary Plan (which uses User) gets these values
-    # We must update the JSONB columns, not flat fields
-    u_personal = dict(current_user.personal_info or {})
-    u_risk = dict(current_user.risk or {})
-    u_expenses = dict(current_user.expenses or {})
+    # We must update the JSONB columns, not flat fields (merged server-side)
+    u_personal = {}
+    u_risk = {}
+    u_expenses = {}
 
-    user_updated = False
     if "expectedAnnualExpenses" in form_data:
-        u_expenses["desiredRetirementSpending"] = safe_decimal(form_data["expectedAnnualExpenses"], 80000)
-        user_updated = True
+        u_expenses["desiredRetirementSpending"] = safe_float(form_data["expectedAnnualExpenses"], 80000)
     if "portfolioGrowthRate" in form_data:
-        u_risk["investmentReturnAssumption"] = safe_decimal(form_data["portfolioGrowthRate"], 7.0)
-        user_updated = True
+        u_risk["investmentReturnAssumption"] = safe_float(form_data["portfolioGrowthRate"], 7.0)
     if "inflationRate" in form_data:
-        u_personal["inflationRateAssumption"] = safe_decimal(form_data["inflationRate"], 3.0)
-        user_updated = True
+        u_personal["inflationRateAssumption"] = safe_float(form_data["inflationRate"], 3.0)
     if "targetRetirementAge" in form_data:
          u_personal["targetRetirementAge"] = int(form_data["targetRetirementAge"])
-         user_updated = True
 
-    if user_updated:
-        current_user.personal_info = u_personal
-        current_user.risk = u_risk
-        current_user.expenses = u_expenses
-        db.add(current_user)
+    await UserService.merge_profile(db, current_user, {
+        "personal_info": u_personal,
+        "risk": u_risk,
+        "expenses": u_expenses,
+    })
     
     current_age = (current_user.personal_info or {}).get("currentAge") or 30
 
@@ -302,11 +281,10 @@ async def generate_primary_plan(
     # 4. Background AI Refresh
     # ... (Keep existing AI logic) ...
     try:
-        g_res = await db.execute(select(UserGoal.title).where(UserGoal.userId == current_user.id, UserGoal.status == "in_progress"))
-        active_goal_titles = g_res.scalars().all()
-        a_res = await db.execute(select(UserActionItem.title).where(UserActionItem.user_id == current_user.id, UserActionItem.status == "todo"))
-        active_action_titles = a_res.scalars().all()
-        background_tasks.add_task(RecommendationEngine.trigger_ai_refresh, current_user, plan_data, active_goal_titles, active_action_titles)
+        # Same titles and portfolio as the dashboard, so the refresh warms the entry it reads
+        active_goal_titles, active_action_titles = await RecommendationEngine.load_titles(db, current_user.id)
+        portfolio_allocation = RecommendationEngine.portfolio_allocation(current_user)
+        background_tasks.add_task(RecommendationEngine.trigger_ai_refresh, current_user, plan_data, active_goal_titles, active_action_titles, portfolio_allocation)
     except Exception as e:
         print(f"Failed to queue AI refresh: {e}")
 
@@ -314,12 +292,10 @@ async def generate_primary_plan(
     await db.refresh(plan_data)
     
     # Reload items
-    stmt = select(AnnualSnapshot).where(AnnualSnapshot.planId == plan_data.id).order_by(AnnualSnapshot.year)
-    result_s = await db.execute(stmt)
-    snapshots = result_s.scalars().all()
+    result_s = await db.execute(SNAPSHOTS_BY_PLAN, {"plan_id": plan_data.id})
+    snapshots = result_s.mappings().all()
     
-    stmt_m = select(UserMilestone).where(UserMilestone.planId == plan_data.id)
-    result_m = await db.execute(stmt_m)
+    result_m = await db.execute(MILESTONES_BY_PLAN, {"plan_id": plan_data.id})
     milestones = result_m.scalars().all()
 
     response = plan_data.model_dump()
@@ -338,7 +314,7 @@ async def generate_primary_plan(
 
     response.update(ui_resolved)
     
-    response["snapshots"] = [AnnualSnapshotRead.model_validate(s.model_dump()) for s in snapshots]
+    response["snapshots"] = [AnnualSnapshotRead.model_validate(dict(s)) for s in snapshots]
     response["milestones"] = milestones
     response["message"] = "Primary plan generated"
     return response
@@ -460,12 +436,11 @@ async def regenerate_plan(
     
     # Background AI Refresh
     try:
-        g_res = await db.execute(select(UserGoal.title).where(UserGoal.userId == current_user.id, UserGoal.status == "in_progress"))
-        active_goal_titles = g_res.scalars().all()
-        a_res = await db.execute(select(UserActionItem.title).where(UserActionItem.user_id == current_user.id, UserActionItem.status == "todo"))
-        active_action_titles = a_res.scalars().all()
+        # Same titles and portfolio as the dashboard, so the refresh warms the entry it reads
+        active_goal_titles, active_action_titles = await RecommendationEngine.load_titles(db, current_user.id)
+        portfolio_allocation = RecommendationEngine.portfolio_allocation(current_user)
         # Note: RecommendationEngine needs to be imported or available
-        background_tasks.add_task(RecommendationEngine.trigger_ai_refresh, current_user, plan, active_goal_titles, active_action_titles)
+        background_tasks.add_task(RecommendationEngine.trigger_ai_refresh, current_user, plan, active_goal_titles, active_action_titles, portfolio_allocation)
     except Exception as e:
         print(f"Failed to queue AI refresh: {e}")
         
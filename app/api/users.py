@@ -1,6 +1,7 @@
+import logging
 from typing import Any, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
@@ -10,6 +11,8 @@ from app.database import get_db
 from app.models.user import User, UserBase, UserUpdate
 from app.models.form_progress import MultiStepFormProgress
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/{user_id}", response_model=User)
@@ -47,12 +50,12 @@ async def update_user(
     result = await db.execute(query)
     plans = result.scalars().all()
     for plan in plans:
-        print(f"Marking plan {plan.id} ({plan.planType}) as stale for user {user_id}")
+        logger.debug("Marking plan %s (%s) as stale for user %s", plan.id, plan.planType, user_id)
         plan.isStale = True
         db.add(plan)
     
     if not plans:
-        print(f"No active plans found for user {user_id} to mark as stale.")
+        logger.debug("No active plans found for user %s to mark as stale.", user_id)
     
     db.add(current_user)
     await db.commit()
@@ -100,7 +103,7 @@ async def save_multi_step_form_progress(
         
         # Always update lastUpdated
         from datetime import datetime
-        existing.lastUpdated = datetime.utcnow()
+        existing.lastUpdated = datetime.now(timezone.utc)
         
         db.add(existing)
         await db.commit()
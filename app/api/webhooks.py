@@ -7,7 +7,7 @@ from sqlmodel import select
 import hmac
 import hashlib
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -73,13 +73,14 @@ async def handle_lemonsqueezy_webhook(
                 if target_date_str.endswith('Z'):
                     target_date_str = target_date_str[:-1] + '+00:00'
                 dt = datetime.fromisoformat(target_date_str)
-                # Convert to naive UTC to satisfy asyncpg/Postgres TIMESTAMP WITHOUT TIME ZONE
-                if dt.tzinfo is not None:
-                    from datetime import timezone
-                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+                # current_period_end is timestamptz; treat offset-less dates as UTC
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
                 user.currentPeriodEnd = dt
             except ValueError:
                 pass
+
+        user.invalidate_access()
                 
         # If active, basic plan -> Access Control Logic could be:
         # checking user.subscriptionStatus == 'active' in dependencies
@@ -1,16 +1,26 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 from app.core.config import settings
 
+# asyncpg keeps a per-connection cache of prepared statements (default 100).
+# Our hot paths (plan/snapshot/account reads) are a small fixed set of queries,
+# so bump it a bit to make sure they never get evicted.
+db_url = make_url(settings.DATABASE_URL)
+if db_url.drivername == "postgresql+asyncpg" and "prepared_statement_cache_size" not in db_url.query:
+    db_url = db_url.update_query_dict({"prepared_statement_cache_size": "500"})
+
 # Create async engine
 # echo=True will log SQL queries for debugging
+# query_cache_size: compiled SQL cache (default 500), sized for all our statements x dialect variants
 engine = create_async_engine(
-    settings.DATABASE_URL, 
+    db_url, 
     echo=False, 
     future=True,
     pool_size=20,
-    max_overflow=0
+    max_overflow=0,
+    query_cache_size=1200
 )
 
 # Async session factory
@@ -36,6 +36,11 @@ if settings.CORS_ORIGIN_URLS:
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    from app.services.ai_service import close_http_client
+    await close_http_client()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
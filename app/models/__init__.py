@@ -10,11 +10,13 @@ from .investment import (
     AssetAllocation, 
     SecurityHolding, 
     RefFund, 
+    RefAccountType,
     InvestmentAccountRead, 
+    InvestmentAccountListItem,
     InvestmentAccountUpdate,
     InvestmentAccountCreate
 )
 from .activity import Activity
-from .roth import RothConversionPlan, RothConversionScenario
+from .roth import RothConversionPlan
 from .goal import UserGoal
 from .action_item import UserActionItem
@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional
 from sqlmodel import SQLModel, Field
 import uuid
+from sqlalchemy import DateTime
+from app.models.common import utcnow
 
 class UserActionItemBase(SQLModel):
     title: str
@@ -15,8 +17,8 @@ class UserActionItem(UserActionItemBase, table=True):
     
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
 
 class UserActionItemCreate(UserActionItemBase):
     pass
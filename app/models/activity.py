@@ -1,9 +1,11 @@
 from typing import Optional, Any
 from uuid import UUID
 from datetime import datetime
-from sqlmodel import SQLModel, Field, JSON
-from sqlalchemy import Column
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
+from app.models.common import utcnow
 
 class Activity(SQLModel, table=True):
     __tablename__ = "activities"
@@ -12,5 +14,5 @@ class Activity(SQLModel, table=True):
     activityType: str = Field(sa_column_kwargs={"name": "activity_type"})
     title: Optional[str] = None
     description: str
-    date: datetime = Field(default_factory=datetime.utcnow)
-    activity_metadata: Optional[Any] = Field(default=None, sa_column=Column("metadata", JSON))
+    date: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    activity_metadata: Optional[Any] = Field(default=None, sa_column=Column("metadata", JSONB))
@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    # Timezone-aware "now" for model defaults (timestamp columns are TIMESTAMPTZ)
+    return datetime.now(timezone.utc)
@@ -2,14 +2,16 @@ from typing import Optional, List, Dict, Any
 from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import JSON, Column
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
 from app.models.user import User
+from app.models.common import utcnow
 
 class MultiStepFormProgressBase(SQLModel):
     currentStep: int = Field(default=1, sa_column_kwargs={"name": "current_step"})
-    completedSteps: List[int] = Field(default=[], sa_column=Column(JSON, name="completed_steps"))
-    formData: Dict[str, Any] = Field(default={}, sa_column=Column(JSON, name="form_data"))
+    completedSteps: List[int] = Field(default_factory=list, sa_column=Column(JSONB, name="completed_steps"))
+    formData: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB, name="form_data"))
     isCompleted: bool = Field(default=False, sa_column_kwargs={"name": "is_completed"})
 
 class MultiStepFormProgress(MultiStepFormProgressBase, table=True):
@@ -17,7 +19,7 @@ class MultiStepFormProgress(MultiStepFormProgressBase, table=True):
     
     id: UUID = Field(default_factory=uuid7, primary_key=True)
     userId: UUID = Field(foreign_key="users.id", sa_column_kwargs={"name": "user_id"})
-    lastUpdated: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "last_updated"})
+    lastUpdated: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "last_updated"})
 
 class MultiStepFormProgressCreate(MultiStepFormProgressBase):
     pass
@@ -3,6 +3,8 @@ from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
 from uuid6 import uuid7
+from sqlalchemy import DateTime
+from app.models.common import utcnow
 
 # Goals Models
 
@@ -25,6 +27,6 @@ class UserGoal(SQLModel, table=True):
     valueType: str = Field(default="money", sa_column_kwargs={"name": "value_type"}) # money, percent, number
     
     # Timestamps
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
 
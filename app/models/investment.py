@@ -3,16 +3,17 @@ from uuid import UUID
 from decimal import Decimal
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
+from app.models.common import utcnow
 
 class RefAccountType(SQLModel, table=True):
     __tablename__ = "ref_account_types"
     id: UUID = Field(default_factory=uuid7, primary_key=True)
     code: str = Field(unique=True, index=True) # e.g. "401k", "brokerage"
     name: str # e.g. "401(k)", "Brokerage Account"
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
 
 class InvestmentAccountBase(SQLModel):
     # Removing foreign_key="users.id" due to "permission denied for table users"
@@ -27,8 +28,8 @@ class InvestmentAccount(InvestmentAccountBase, table=True):
     # Using new table name to bypass 'investment_accounts' permission lock
     __tablename__ = "portfolio_accounts" 
     id: UUID = Field(default_factory=uuid7, primary_key=True)
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
     
     # Relationships
     allocations: List["AssetAllocation"] = Relationship(back_populates="account", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
@@ -45,6 +46,9 @@ class InvestmentAccountCreate(SQLModel):
     # accountName is ignored as we use RefAccountType name
 
 class InvestmentAccountRead(InvestmentAccountBase):
+    # Response-only: never mutated after construction
+    model_config = {"frozen": True, "extra": "ignore"}
+
     id: UUID
     # Flattened properties for frontend compatibility
     accountName: str 
@@ -52,7 +56,15 @@ class InvestmentAccountRead(InvestmentAccountBase):
     # Removed unused fields from Read model as well
     createdAt: datetime
     updatedAt: datetime
-    holdings: List["SecurityHolding"] = []
+    holdings: List["SecurityHolding"] = Field(default_factory=list)
+
+class InvestmentAccountListItem(SQLModel):
+    # Lightweight row for account pickers / summaries (no holdings)
+    id: UUID
+    accountName: str
+    accountType: str
+    accountOwner: str
+    balance: Decimal
 
 class InvestmentAccountUpdate(SQLModel):
     # Restored balance for editing
@@ -67,8 +79,8 @@ class AssetAllocation(SQLModel, table=True):
     assetCategory: str = Field(sa_column_kwargs={"name": "asset_category"})
     percentage: Decimal = Field(max_digits=5, decimal_places=2)
     value: Decimal = Field(max_digits=12, decimal_places=2)
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
     
     account: InvestmentAccount = Relationship(back_populates="allocations")
 
@@ -90,8 +102,8 @@ class SecurityHolding(SQLModel, table=True):
     domesticPct: Optional[Decimal] = Field(default=None, max_digits=5, decimal_places=2, sa_column_kwargs={"name": "domestic_pct"})
     cashPct: Optional[Decimal] = Field(default=None, max_digits=5, decimal_places=2, sa_column_kwargs={"name": "cash_pct"})
 
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
 
     account: InvestmentAccount = Relationship(back_populates="holdings")
 
@@ -103,10 +115,9 @@ class RefFund(SQLModel, table=True):
     region: str = Field(default="domestic") # domestic, international, emerging, global
     expenseRatio: Optional[Decimal] = Field(default=None, max_digits=5, decimal_places=4, sa_column_kwargs={"name": "expense_ratio"})
     sectors: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSONB)) # JSONB for sector breakdown
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
 
 # Resolve Forward References
-InvestmentAccount.model_rebuild()
+# Only the read model needs it (List["SecurityHolding"]); the table models'
+# string refs are relationships and get resolved by the SQLAlchemy mapper.
 InvestmentAccountRead.model_rebuild()
-AssetAllocation.model_rebuild()
-SecurityHolding.model_rebuild()
@@ -2,7 +2,9 @@ from typing import Optional
 from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, DateTime, Index, Numeric, text
 from uuid6 import uuid7
+from app.models.common import utcnow
 
 # Milestone Models
 
@@ -27,19 +29,24 @@ class UserMilestone(MilestoneBase, table=True):
     isCompleted: bool = Field(default=False, sa_column_kwargs={"name": "is_completed"})
     color: str = Field(default="#3b82f6")
     
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
 
 
 class RefMilestone(SQLModel, table=True):
     __tablename__ = "ref_milestones"
+    __table_args__ = (
+        Index("ix_ref_milestones_active_sort", "sort_order", postgresql_where=text("is_active")),
+    )
     id: UUID = Field(default_factory=uuid7, primary_key=True)
     title: str
     description: str
-    targetAge: float = Field(sa_column_kwargs={"name": "target_age"})
+    # Ages are whole or half years (59.5), numeric(4,1) keeps them exact.
+    # asdecimal=False so the API still returns plain numbers.
+    targetAge: float = Field(sa_column=Column("target_age", Numeric(4, 1, asdecimal=False), nullable=False))
     category: str
     icon: str
     isActive: bool = Field(default=True, sa_column_kwargs={"name": "is_active"})
     sortOrder: int = Field(default=0, sa_column_kwargs={"name": "sort_order"})
     
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
@@ -2,10 +2,11 @@ from typing import Optional, List, Any, Dict
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship, JSON
-from sqlalchemy import Column
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
+from app.models.common import utcnow
 
 # Retirement Plan Models
 
@@ -33,9 +34,16 @@ class RetirementPlanBase(SQLModel):
 
 class RetirementPlan(RetirementPlanBase, table=True):
     __tablename__ = "retirement_plans"
+    # Partial indexes: only live/stale rows are indexed, so they stay tiny
+    __table_args__ = (
+        Index("ix_retirement_plans_user_active", "user_id", postgresql_where=text("is_active")),
+        Index("ix_retirement_plans_user_stale", "user_id", postgresql_where=text("is_stale")),
+        # Scenario comparison filters on override keys (planOverrides @> {...})
+        Index("ix_retirement_plans_overrides_gin", "plan_overrides", postgresql_using="gin", postgresql_ops={"plan_overrides": "jsonb_path_ops"}),
+    )
     id: UUID = Field(default_factory=uuid7, primary_key=True)
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
 
     # Relationships
     snapshots: List["AnnualSnapshot"] = Relationship(back_populates="plan", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
@@ -60,15 +68,15 @@ class AnnualSnapshotBase(SQLModel):
     expenseBreakdown: Optional[Any] = Field(default=None, sa_column=Column(JSONB, name="expense_breakdown"))
     
     # JSONB Columns for Details
-    assets: List[Dict] = Field(default=[], sa_column=Column(JSONB))
-    liabilities: List[Dict] = Field(default=[], sa_column=Column(JSONB))
-    income: List[Dict] = Field(default=[], sa_column=Column(JSONB))
-    expenses: List[Dict] = Field(default=[], sa_column=Column(JSONB))
+    assets: List[Dict] = Field(default_factory=list, sa_column=Column(JSONB))
+    liabilities: List[Dict] = Field(default_factory=list, sa_column=Column(JSONB))
+    income: List[Dict] = Field(default_factory=list, sa_column=Column(JSONB))
+    expenses: List[Dict] = Field(default_factory=list, sa_column=Column(JSONB))
 
 class AnnualSnapshot(AnnualSnapshotBase, table=True):
     __tablename__ = "annual_snapshots"
     id: UUID = Field(default_factory=uuid7, primary_key=True)
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
     
     # Relationships
     plan: RetirementPlan = Relationship(back_populates="snapshots")
@@ -80,10 +88,13 @@ class AnnualSnapshot(AnnualSnapshotBase, table=True):
 # Read Models for API Responses
 
 class AnnualSnapshotRead(AnnualSnapshotBase):
+    # Response-only: never mutated after construction
+    model_config = {"frozen": True, "extra": "ignore"}
+
     id: UUID
     createdAt: datetime
-    assets: List[Dict] = []
-    liabilities: List[Dict] = []
-    income: List[Dict] = []
-    expenses: List[Dict] = []
+    assets: List[Dict] = Field(default_factory=list)
+    liabilities: List[Dict] = Field(default_factory=list)
+    income: List[Dict] = Field(default_factory=list)
+    expenses: List[Dict] = Field(default_factory=list)
 
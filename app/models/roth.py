@@ -1,9 +1,12 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
+from app.models.common import utcnow
 
 class RothConversionPlanBase(SQLModel):
     userId: UUID = Field(foreign_key="users.id", sa_column_kwargs={"name": "user_id"})
@@ -22,25 +25,14 @@ class RothConversionPlanBase(SQLModel):
 
 class RothConversionPlan(RothConversionPlanBase, table=True):
     __tablename__ = "roth_conversion_plans"
+    __table_args__ = (
+        Index("ix_roth_conversion_plans_user_active", "user_id", postgresql_where=text("is_active")),
+    )
     id: UUID = Field(default_factory=uuid7, primary_key=True)
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-    updatedAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "updated_at"})
+    createdAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "created_at"})
+    updatedAt: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "updated_at"})
 
-    scenarios: List["RothConversionScenario"] = Relationship(back_populates="plan", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
-
-
-class RothConversionScenario(SQLModel, table=True):
-    __tablename__ = "roth_conversion_scenarios"
-    id: UUID = Field(default_factory=uuid7, primary_key=True)
-    planId: UUID = Field(foreign_key="roth_conversion_plans.id", sa_column_kwargs={"name": "plan_id"})
-    year: int
-    age: int
-    conversionAmount: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "conversion_amount"})
-    taxCost: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "tax_cost"})
-    traditionalBalance: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "traditional_balance"})
-    rothBalance: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "roth_balance"})
-    totalTaxPaid: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "total_tax_paid"})
-    netWorth: Decimal = Field(max_digits=12, decimal_places=2, sa_column_kwargs={"name": "net_worth"})
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
-
-    plan: RothConversionPlan = Relationship(back_populates="scenarios")
+    # Per-year conversion schedule, always read/written as a whole with the plan
+    # (same approach as the annual snapshot details):
+    # [{"year", "age", "conversionAmount", "taxCost", "traditionalBalance", "rothBalance", "totalTaxPaid", "netWorth"}, ...]
+    scenarios: List[Dict] = Field(default_factory=list, sa_column=Column(JSONB))
@@ -1,43 +1,48 @@
+from functools import cached_property
 from typing import Optional, List, Any, Dict
 from uuid import UUID
-from decimal import Decimal
+from pydantic import create_model
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, DateTime, Index, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from uuid6 import uuid7
-from datetime import datetime
+from datetime import datetime, timezone
 
 class UserBase(SQLModel):
     email: str = Field(unique=True, index=True)
     password_hash: Optional[str] = Field(default=None, sa_column_kwargs={"name": "password_hash"}) # Keep legacy/auth fields if any? User model has 'password'.
     
     # JSONB Buckets
-    personal_info: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
-    income: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
-    expenses: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
-    assets: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
-    liabilities: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
-    risk: Dict[str, Any] = Field(default={}, sa_column=Column(JSONB))
+    personal_info: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    income: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    expenses: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    assets: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    liabilities: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    risk: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
 
     # Removed flat columns:
     # firstName, lastName, currentAge, targetRetirementAge, currentLocation, maritalStatus, dependents, desiredLifestyle, currency
     # hasSpouse, spouseFirstName, spouseLastName, spouseCurrentAge, spouseTargetRetirementAge, spouseCurrentIncome
     # currentIncome ... all the way down to investmentRebalancingPreference
 
-class UserUpdate(SQLModel):
-    # Flexible update model accepting partial JSON updates or specific keys if we want to support legacy API temporarily?
-    # No, assuming refactor implies updating the API consumers too.
-    email: Optional[str] = None
-    
-    personal_info: Optional[Dict[str, Any]] = None
-    income: Optional[Dict[str, Any]] = None
-    expenses: Optional[Dict[str, Any]] = None
-    assets: Optional[Dict[str, Any]] = None
-    liabilities: Optional[Dict[str, Any]] = None
-    risk: Optional[Dict[str, Any]] = None
+# Partial-update schema: every UserBase field optional, generated rather than hand-copied
+# so it can't drift from UserBase. Auth columns are never client-writable.
+UserUpdate = create_model(
+    "UserUpdate",
+    __base__=SQLModel,
+    **{
+        name: (Optional[field.annotation], None)
+        for name, field in UserBase.model_fields.items()
+        if name != "password_hash"
+    },
+)
 
 class User(UserBase, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Subscription/access lookups; most users never subscribe, so leave them out
+        Index("ix_users_access", "subscription_status", "current_period_end", postgresql_where=text("subscription_status <> 'none'")),
+    )
     id: UUID = Field(default_factory=uuid7, primary_key=True)
     password: Optional[str] = None # Virtual field for input, not column. Actual column is password_hash in Base.
     
@@ -47,7 +52,7 @@ class User(UserBase, table=True):
     subscriptionId: str | None = Field(default=None, sa_column_kwargs={"name": "subscription_id"})
     customerId: str | None = Field(default=None, sa_column_kwargs={"name": "customer_id"})
     variantId: str | None = Field(default=None, sa_column_kwargs={"name": "variant_id"})
-    currentPeriodEnd: datetime | None = Field(default=None, sa_column_kwargs={"name": "current_period_end"})
+    currentPeriodEnd: datetime | None = Field(default=None, sa_type=DateTime(timezone=True), sa_column_kwargs={"name": "current_period_end"})
 
     role: str = Field(default="user", sa_column_kwargs={"name": "role"}) # user, admin
     
@@ -55,9 +60,12 @@ class User(UserBase, table=True):
     googleId: Optional[str] = Field(default=None, sa_column_kwargs={"name": "google_id", "unique": True})
     profilePicture: Optional[str] = Field(default=None, sa_column_kwargs={"name": "profile_picture"})
     
-    createdAt: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"name": "created_at"})
+    # Filled by Postgres NOW() on insert (callers refresh after commit)
+    createdAt: Optional[datetime] = Field(default=None, sa_column=Column("created_at", DateTime(timezone=True), server_default=func.now(), nullable=False))
 
-    @property
+    # Memoized per instance; users are loaded per request, so anything that changes
+    # subscription fields on a live instance must call invalidate_access()
+    @cached_property
     def has_access(self) -> bool:
         # Admins always have access
         if self.role == "admin":
@@ -69,16 +77,15 @@ class User(UserBase, table=True):
             
         # Cancelled users have access until the period ends
         if self.subscriptionStatus == "cancelled" and self.currentPeriodEnd:
-            # Check if end date is in the future
-            # Ensure timezone awareness matches (using utcnow for safety)
-            # currentPeriodEnd is stored as datetime
-            # If naive, assume UTC.
-            now = datetime.utcnow()
-            if self.currentPeriodEnd.replace(tzinfo=None) > now:
+            # Check if end date is in the future (column is timestamptz, so both sides are aware)
+            if self.currentPeriodEnd > datetime.now(timezone.utc):
                 return True
                 
         return False
 
+    def invalidate_access(self) -> None:
+        self.__dict__.pop("has_access", None)
+
 class UserRead(UserBase):
     id: UUID
     role: str
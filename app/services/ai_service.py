@@ -1,101 +1,440 @@
+import asyncio
+import functools
 import os
 
-import json
+import hashlib
+import sqlite3
+import threading
 import logging
+import re
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Optional
+
+import httpx
+import orjson
+from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path("app/cache")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DB = CACHE_DIR / "ai_cache.db"
 CACHE_TTL = 3600  # 1 hour in seconds
+MEMO_MAX_ENTRIES = 1024
+CACHE_FORMAT_VERSION = 2  # v2 payloads hold already-normalized recommendations
+MAX_EXISTING_RECOMMENDATIONS = 20  # Only the most recent ones go into the prompt
+
+# Compiled once; runs on every LLM response
+_CODEFENCE_RE = re.compile(r'```(?:json)?')
+
+
+def _strip_think(text: str) -> str:
+    # Drop <think>...</think> blocks (DeepSeek reasoning) with a linear str.find scan;
+    # an unterminated <think> is left as-is
+    if "<think>" not in text:
+        return text
+    pieces = []
+    pos = 0
+    while True:
+        i = text.find("<think>", pos)
+        if i == -1:
+            break
+        j = text.find("</think>", i + 7)
+        if j == -1:
+            break
+        pieces.append(text[pos:i])
+        pos = j + 8
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def _clean_model_text(text: str) -> str:
+    # Shared cleanup for raw model output: reasoning blocks, then markdown fences
+    text = _strip_think(text.strip()).strip()
+    return _CODEFENCE_RE.sub('', text).strip()
+
+
+# Portfolio extraction prompt, shared by both providers
+_EXTRACTION_PROMPT = """
+        You are an intelligent financial data extraction assistant. 
+        Analyze the attached document (which may be a brokerage statement or screenshot) and extract all investment account and holding information.
+        
+        Return a JSON object with this structure:
+        {
+          "accounts": [
+            {
+              "accountName": "string (e.g. 'Individual Brokerage', 'Roth IRA')",
+              "accountType": "string (one of: '401k', 'roth_ira', 'traditional_ira', 'brokerage', 'hsa')",
+              "balance": number,
+              "holdings": [
+                {
+                   "ticker": "string (e.g. AAPL, VTI)",
+                   "name": "string (optional security name)",
+                   "percentage": "string (percentage of account, e.g. '25.5')",
+                   "amount": number (optional, dollar amount if percentage not available)
+                }
+              ]
+            }
+          ]
+        }
+        
+        Rules:
+        1. If multiple accounts are detected, list them all.
+        2. **CRITICAL**: The 'balance' field MUST be the total value of the account (e.g. 'Total Account Value', 'Ending Balance', 'Portfolio Value').
+           - If you cannot find an explicit 'Total' line, you MUST calculate the balance by summing the values of the individual holdings.
+           - Ensure the 'balance' is NOT just the value of the first holding found.
+           - The balance should be typically >= the sum of holdings.
+        3. Account Type Mapping (Stricly enforce these values):
+           - "401k": For 401(k), 403(b), 457, or similar employer plans.
+           - "roth_ira": For Roth IRAs (Contributory, Rollover, etc).
+           - "traditional_ira": For Traditional IRAs, SEP IRAs, Simple IRAs, Rollover IRAs.
+           - "hsa": For Health Savings Accounts.
+           - "brokerage": For invalid types, individual/joint taxable accounts, or if unsure.
+        3. Extract holdings for each account. 
+           - **CRITICAL**: Look for columns labeled "Market Value", "Current Value", "Amount", or similar. 
+           - Map this directly to the "amount" field in the JSON.
+           - Do not ignore the dollar value if it is present.
+        4. If a holding has no ticker (e.g. "Cash"), use symbol "CASH" or similar.
+        5. Return RAW JSON only. No markdown formatting.
+        """
+
+# In-process LRU in front of the disk cache: key -> (stored_at, recommendations, user_id)
+_memo: "OrderedDict[str, tuple[float, list[dict], str]]" = OrderedDict()
+
+# Shared async client so Ollama calls reuse pooled keep-alive connections
+# instead of opening a fresh socket (and blocking a worker) per request.
+# Fail fast on connect, and retry connection errors (e.g. Ollama restarting) a few times.
+_http = httpx.AsyncClient(
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    # Pool limits live on the transport (the client's own limits are ignored once one is passed)
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+    ),
+)
+
+
+async def close_http_client() -> None:
+    await _http.aclose()
+
+
+@functools.lru_cache(maxsize=4)
+def _google_client(api_key: str):
+    # genai.Client sets up auth and HTTP pools; build it once per key and reuse it
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+# Static parts of the advice prompt, encoded once; only the JSON sections vary per call
+_ADVICE_PROMPT_HEADER = b"""You are an expert financial advisor. Analyze the following user data and suggest 2-3 specific, actionable financial recommendations.
+"""
+
+_ADVICE_PROMPT_SECTIONS = (
+    b"\nUSER PROFILE:\n",
+    b"\n\nRETIREMENT PLAN:\n",
+    b"\n\nEXISTING GOALS:\n",
+    b"\n\nEXISTING ACTIONS:\n",
+    b"\n\nCURRENT RULE-BASED RECOMMENDATIONS:\n",
+)
+
+_ADVICE_PROMPT_FOOTER = b"""
+
+INSTRUCTIONS:
+1. Suggest NEW recommendations that are NOT covered by existing goals, actions, or current recommendations.
+2. Focus on high impact recommendations first. 
+3. Include details of what you see in the plan that is prompting you to give the recommendation.  
+4. If the recommendation is for certain thresholds, like expense is greater than certain percent of income, set that up as a goal and provide both percent numbers as current and target.
+5. Return a JSON array of objects. Each object must strictly follow this schema:
+   {
+     "id": "ai_rec_<unique_suffix>",
+     "title": "Short Title",
+     "description": "One sentence description.",
+     "impact": "high" | "medium" | "info",
+     "status": "active",
+     "actionType": "ACTION" | "GOAL", 
+     "category": "saving" | "investing" | "debt" | "risk" | "estate" | "tax",
+     "data": { 
+        "icon": "Lightbulb" | "TrendingUp" | "Shield" | "AlertCircle" | "Info",
+        "goalCategory": "savings" | "retirement" | "debt" | "income" (only if actionType=GOAL),
+        "actionCategory": "general" | "legal" | "investment" | "budget" (only if actionType=ACTION),
+        "currentValue": <number> (optional, for tracking progress),
+        "targetValue": <number> (optional, for tracking progress)
+        "valueType": "money" | "percent" | "number" (REQUIRED. Default "money". Use "number" for age/years/counts, "percent" for rates, "money" for currency) 
+     }
+   }
+6. Do not output markdown code blocks. Output RAW JSON only.
+"""
+
+
+_SECTION_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _serialize_sections(*sections) -> list[bytes]:
+    # Each prompt section is encoded exactly once; the same bytes feed both the cache key
+    # and the prompt. Compact JSON: the model reads it just as well and indentation only
+    # costs input tokens. Sorted keys keep the encoding canonical for hashing.
+    return [orjson.dumps(section, option=_SECTION_OPTIONS) for section in sections]
+
+
+def _build_advice_prompt(parts: list[bytes]) -> str:
+    buf = bytearray(_ADVICE_PROMPT_HEADER)
+    for label, part in zip(_ADVICE_PROMPT_SECTIONS, parts):
+        buf += label
+        buf += part
+    buf += _ADVICE_PROMPT_FOOTER
+    return buf.decode()
+
+
+# goalCategory / actionCategory (as enumerated in the prompt schema) -> recommendation category.
+# Ordered: for free-form model output ("retirement savings", "legal/estate") the first key
+# contained in the value wins, same as the original substring checks.
+_GOAL_CATEGORY_MAP = {"retirement": "investing", "debt": "debt"}
+_ACTION_CATEGORY_MAP = {"investment": "investing", "legal": "estate"}
+
+
+def _lookup_category(value, table: dict) -> str:
+    v = str(value).lower()
+    # Exact schema values are one dict hit; only off-schema output pays for the scan
+    hit = table.get(v)
+    if hit is not None:
+        return hit
+    for key, category in table.items():
+        if key in v:
+            return category
+    return "saving"
+
+
+def _derive_category(data: dict) -> str:
+    # Attempt to derive from data; anything unmapped falls back to "saving"
+    if "goalCategory" in data:
+        return _lookup_category(data["goalCategory"], _GOAL_CATEGORY_MAP)
+    if "actionCategory" in data:
+        return _lookup_category(data["actionCategory"], _ACTION_CATEGORY_MAP)
+    return "saving" # Safe default
+
+
+class AIRecommendation(BaseModel):
+    """
+    Shape of one recommendation coming back from the model. Only the fields we
+    backfill are declared; everything else (title, impact, actionType, data, ...)
+    passes through untouched.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    status: str = "active"
+    description: Optional[str] = None
+    category: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _fill_derived(self):
+        extra = self.model_extra or {}
+        if not self.description:
+            self.description = f"AI Recommendation: {extra.get('title', 'Financial Advice')}"
+        if "category" not in self.model_fields_set:
+            self.category = _derive_category(extra.get("data") or {})
+        return self
+
+
+def _normalize_recommendations(items) -> list[dict]:
+    # Defaults and type checks in one validation pass per item; anything that isn't a
+    # recommendation-shaped object (wrong types, not a dict) is dropped rather than
+    # failing the whole batch
+    recs = []
+    for item in items:
+        try:
+            recs.append(AIRecommendation.model_validate(item).model_dump())
+        except ValidationError as e:
+            logger.warning(f"Dropping malformed AI recommendation: {e}")
+    return recs
+
+
+def _hash_parts(parts: list[bytes]) -> str:
+    # Content hash of the prompt inputs, so a changed profile/plan never serves stale advice
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _cache_key(*inputs) -> str:
+    return _hash_parts(_serialize_sections(*inputs))
+
+
+def _quantize(obj):
+    # Round numbers to 2 significant figures so small drift (a balance ticking up,
+    # a slightly different spend target) maps to the same fingerprint
+    if isinstance(obj, bool):
+        return obj
+    if isinstance(obj, (int, float)):
+        return float(f"{obj:.2g}")
+    if isinstance(obj, dict):
+        return {k: _quantize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_quantize(v) for v in obj]
+    return obj
+
+
+def _similarity_key(user_id: str, user_profile, plan_summary, goals, actions, existing_recommendations) -> str:
+    # Coarse per-user fingerprint for the near-duplicate tier. Rule-based recs are reduced
+    # to their ids since their descriptions embed the (unrounded) numbers.
+    return "~" + user_id + ":" + _cache_key(
+        _quantize(user_profile),
+        _quantize(plan_summary),
+        goals,
+        actions,
+        [r.get("id") for r in existing_recommendations],
+    )
+
+
+_db_lock = threading.Lock()
+_db_conn: sqlite3.Connection | None = None
+
+
+def _cache_db() -> sqlite3.Connection:
+    # One shared connection, opened lazily; every access goes through _db_lock since the
+    # callers run on asyncio.to_thread workers
+    global _db_conn
+    if _db_conn is None:
+        conn = sqlite3.connect(CACHE_DB, check_same_thread=False, isolation_level=None)
+        # WAL: readers never block on the writer, and no fsync per read
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_rec ("
+            " user_id TEXT NOT NULL,"
+            " prompt_hash TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " PRIMARY KEY (user_id, prompt_hash))"
+        )
+        _db_conn = conn
+    return _db_conn
+
+
+def _read_cache_entry(user_id: str, key: str) -> tuple[float, list] | None:
+    # Returns (created_at, data) for a fresh entry, None if missing or expired
+    with _db_lock:
+        db = _cache_db()
+        row = db.execute(
+            "SELECT created_at, payload FROM ai_rec WHERE user_id = ? AND prompt_hash = ?",
+            (user_id, key),
+        ).fetchone()
+        if row is None:
+            return None
+        created_at, payload = row
+        if time.time() - created_at > CACHE_TTL:
+            db.execute("DELETE FROM ai_rec WHERE user_id = ? AND prompt_hash = ?", (user_id, key))
+            return None
+    entry = orjson.loads(payload)
+    if isinstance(entry, dict) and entry.get("v") == CACHE_FORMAT_VERSION:
+        return created_at, entry["items"]
+    # Older rows are a bare list written before normalization was guaranteed
+    return created_at, _normalize_recommendations(entry)
+
+
+def _write_cache_entry(user_id: str, key: str, data: list) -> None:
+    # Only the entry for the user's current inputs is worth keeping, so the upsert
+    # also drops the user's older hashes (one transaction, so readers never see a gap)
+    payload = orjson.dumps({"v": CACHE_FORMAT_VERSION, "items": data})
+    with _db_lock:
+        db = _cache_db()
+        with db:
+            db.execute("BEGIN")
+            db.execute("DELETE FROM ai_rec WHERE user_id = ? AND prompt_hash <> ?", (user_id, key))
+            db.execute(
+                "INSERT OR REPLACE INTO ai_rec (user_id, prompt_hash, created_at, payload) VALUES (?, ?, ?, ?)",
+                (user_id, key, time.time(), payload),
+            )
+
+
+def _delete_cache_entries(user_id: str) -> None:
+    with _db_lock:
+        _cache_db().execute("DELETE FROM ai_rec WHERE user_id = ?", (user_id,))
+
+
+def _memo_get(key: str) -> list[dict] | None:
+    entry = _memo.get(key)
+    if entry is None:
+        return None
+    stored_at, data, _ = entry
+    if time.time() - stored_at > CACHE_TTL:
+        del _memo[key]
+        return None
+    _memo.move_to_end(key)
+    return list(data)
+
+
+def _memo_put(key: str, data: list[dict], user_id: str, stored_at: float | None = None) -> None:
+    _memo[key] = (stored_at if stored_at is not None else time.time(), list(data), user_id)
+    _memo.move_to_end(key)
+    while len(_memo) > MEMO_MAX_ENTRIES:
+        _memo.popitem(last=False)
+
+
+def _memo_drop_user(user_id: str) -> None:
+    for key in [k for k, entry in _memo.items() if entry[2] == user_id]:
+        del _memo[key]
+
 
 class AIService:
     @staticmethod
-    def generate_financial_advice(
+    async def generate_financial_advice(
         user_profile: dict,
         plan_summary: dict,
         goals: list[dict],
         actions: list[dict],
         existing_recommendations: list[dict],
         user_id: str = "default",
-        force_refresh: bool = False
+        force_refresh: bool = False,
+        raise_errors: bool = False
     ) -> list[dict]:
         """
         Generates financial recommendations using Google Gemini.
         Expected API Key in env: GEMINI_API_KEY
+
+        Provider/LLM failures are logged and come back as [] unless raise_errors is set,
+        in which case they propagate so the caller can tell "failed" from "nothing to suggest".
         """
         api_key = settings.GEMINI_API_KEY
         if not api_key:
             logger.warning("GEMINI_API_KEY not found. Skipping AI recommendations.")
             return []
 
+        # Older recommendations add prompt tokens without changing the advice much
+        existing_recommendations = existing_recommendations[-MAX_EXISTING_RECOMMENDATIONS:]
+
         # --- Caching Logic ---
-        cache_file = CACHE_DIR / f"ai_rec_{user_id}.json"
+        sections = _serialize_sections(user_profile, plan_summary, goals, actions, existing_recommendations)
+        cache_key = _hash_parts(sections)
+        similar_key = _similarity_key(user_id, user_profile, plan_summary, goals, actions, existing_recommendations)
         
         # Skip cache read if force_refresh is True
-        cache_exists = cache_file.exists()
-        print(f"AI Cache Check: User={user_id}, Force={force_refresh}, Enabled={settings.AI_CACHE_ENABLED}, Exists={cache_exists}, Path={cache_file}")
-        
-        if not force_refresh and settings.AI_CACHE_ENABLED and cache_exists:
+        if not force_refresh and settings.AI_CACHE_ENABLED:
+            cached = _memo_get(cache_key)
+            if cached is not None:
+                return cached
+
             try:
-                logger.info(f"Serving AI recommendations from cache for user {user_id}")
-                with open(cache_file, "r") as f:
-                    data = json.load(f)
-                    # Ensure status is present (fix for existing bad cache)
-                    for r in data:
-                        if "status" not in r:
-                            r["status"] = "active"
+                cached = await asyncio.to_thread(_read_cache_entry, user_id, cache_key)
+                if cached is not None:
+                    stored_at, data = cached
+                    logger.info(f"Serving AI recommendations from cache for user {user_id}")
+                    _memo_put(cache_key, data, user_id, stored_at)
                     return data
             except Exception as e:
                 logger.warning(f"Failed to read cache: {e}")
 
-        # Prepare Prompt (Shared)
-        prompt = f"""
-        You are an expert financial advisor. Analyze the following user data and suggest 2-3 specific, actionable financial recommendations.
-        
-        USER PROFILE:
-        {json.dumps(user_profile, indent=2)}
-
-        RETIREMENT PLAN:
-        {json.dumps(plan_summary, indent=2)}
-
-        EXISTING GOALS:
-        {json.dumps(goals, indent=2)}
-
-        EXISTING ACTIONS:
-        {json.dumps(actions, indent=2)}
-
-        CURRENT RULE-BASED RECOMMENDATIONS:
-        {json.dumps(existing_recommendations, indent=2)}
-
-        INSTRUCTIONS:
-        1. Suggest NEW recommendations that are NOT covered by existing goals, actions, or current recommendations.
-        2. Focus on high impact recommendations first. 
-        3. Include details of what you see in the plan that is prompting you to give the recommendation.  
-        4. If the recommendation is for certain thresholds, like expense is greater than certain percent of income, set that up as a goal and provide both percent numbers as current and target.
-        5. Return a JSON array of objects. Each object must strictly follow this schema:
-           {{
-             "id": "ai_rec_<unique_suffix>",
-             "title": "Short Title",
-             "description": "One sentence description.",
-             "impact": "high" | "medium" | "info",
-             "status": "active",
-             "actionType": "ACTION" | "GOAL", 
-             "category": "saving" | "investing" | "debt" | "risk" | "estate" | "tax",
-             "data": {{ 
-                "icon": "Lightbulb" | "TrendingUp" | "Shield" | "AlertCircle" | "Info",
-                "goalCategory": "savings" | "retirement" | "debt" | "income" (only if actionType=GOAL),
-                "actionCategory": "general" | "legal" | "investment" | "budget" (only if actionType=ACTION),
-                "currentValue": <number> (optional, for tracking progress),
-                "targetValue": <number> (optional, for tracking progress)
-                "valueType": "money" | "percent" | "number" (REQUIRED. Default "money". Use "number" for age/years/counts, "percent" for rates, "money" for currency) 
-             }}
-           }}
-        6. Do not output markdown code blocks. Output RAW JSON only.
-        """
+            # Near-duplicate of a recent request for this user (numbers drifted a little)
+            cached = _memo_get(similar_key)
+            if cached is not None:
+                logger.info(f"Serving AI recommendations from near-duplicate cache for user {user_id}")
+                return cached
+
+        prompt = _build_advice_prompt(sections)
 
         try:
             recommendations = []
@@ -109,47 +448,22 @@ class AIService:
             
             if provider == "ollama":
                 logger.info(f"Using AI Provider: Ollama ({settings.OLLAMA_MODEL})")
-                recommendations = AIService._generate_ollama(prompt)
+                recommendations = await AIService._generate_ollama(prompt)
             elif provider == "google":
-                # Default to Google
-                api_key = settings.GEMINI_API_KEY
-                if not api_key:
-                    logger.info("GEMINI_API_KEY not found. Skipping Google AI recommendations.")
-                    return []
-                recommendations = AIService._generate_google(api_key, prompt)
+                # api_key was already checked on entry
+                recommendations = await AIService._generate_google(api_key, prompt)
             else:
                 logger.warning(f"Unknown AI_PROVIDER '{provider}'. Skipping AI.")
                 return []
             
-            # Enforce required fields (status, category) just in case AI missed them
-            for r in recommendations:
-                if "status" not in r:
-                    r["status"] = "active"
-
-                if "description" not in r or not r["description"]:
-                    r["description"] = f"AI Recommendation: {r.get('title', 'Financial Advice')}"
-                
-                if "category" not in r:
-                    # Attempt to derive from data
-                    data = r.get("data", {})
-                    if "goalCategory" in data:
-                        gc = data["goalCategory"].lower()
-                        if "retirement" in gc: r["category"] = "investing"
-                        elif "debt" in gc: r["category"] = "debt"
-                        else: r["category"] = "saving"
-                    elif "actionCategory" in data:
-                        ac = data["actionCategory"].lower()
-                        if "investment" in ac: r["category"] = "investing"
-                        elif "legal" in ac: r["category"] = "estate"
-                        elif "budget" in ac: r["category"] = "saving"
-                        else: r["category"] = "saving"
-                    else:
-                        r["category"] = "saving" # Safe default
+            # Enforce required fields (status, description, category) just in case AI missed them
+            recommendations = _normalize_recommendations(recommendations)
             
             # Save to Cache
+            _memo_put(cache_key, recommendations, user_id)
+            _memo_put(similar_key, recommendations, user_id)
             try:
-                with open(cache_file, "w") as f:
-                    json.dump(recommendations, f)
+                await asyncio.to_thread(_write_cache_entry, user_id, cache_key, recommendations)
             except Exception as e:
                 logger.warning(f"Failed to write cache: {e}")
 
@@ -157,11 +471,45 @@ class AIService:
 
         except Exception as e:
             logger.error(f"Error generating AI recommendations: {e}")
+            if raise_errors:
+                raise
             return []
 
 
     @staticmethod
-    def extract_portfolio_from_file(
+    async def invalidate_user_cache(user_id: str) -> None:
+        """
+        Drops every cached recommendation set for user_id, in memory and on disk,
+        so the next request for that user goes to the provider.
+        """
+        _memo_drop_user(user_id)
+        if not settings.AI_CACHE_ENABLED:
+            return
+        try:
+            await asyncio.to_thread(_delete_cache_entries, user_id)
+        except Exception as e:
+            logger.warning(f"Failed to clear cache: {e}")
+
+    @staticmethod
+    async def generate_financial_advice_batch(
+        user_payloads: list[dict],
+        max_concurrency: int = 32
+    ) -> list[list[dict]]:
+        """
+        Runs generate_financial_advice for many users concurrently (e.g. bulk refresh).
+        Each payload holds that method's keyword arguments. At most `max_concurrency`
+        LLM calls are in flight at once; results come back in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(payload: dict) -> list[dict]:
+            async with semaphore:
+                return await AIService.generate_financial_advice(**payload)
+
+        return await asyncio.gather(*(_one(p) for p in user_payloads))
+
+    @staticmethod
+    async def extract_portfolio_from_file(
         file_content: bytes,
         mime_type: str,
         user_id: str = "default"
@@ -169,63 +517,21 @@ class AIService:
         """
         Extracts portfolio data from a file (PDF/Image) using the configured AI Provider.
         """
-        # Prepare Prompt (Shared)
-        prompt = """
-        You are an intelligent financial data extraction assistant. 
-        Analyze the attached document (which may be a brokerage statement or screenshot) and extract all investment account and holding information.
-        
-        Return a JSON object with this structure:
-        {
-          "accounts": [
-            {
-              "accountName": "string (e.g. 'Individual Brokerage', 'Roth IRA')",
-              "accountType": "string (one of: '401k', 'roth_ira', 'traditional_ira', 'brokerage', 'hsa')",
-              "balance": number,
-              "holdings": [
-                {
-                   "ticker": "string (e.g. AAPL, VTI)",
-                   "name": "string (optional security name)",
-                   "percentage": "string (percentage of account, e.g. '25.5')",
-                   "amount": number (optional, dollar amount if percentage not available)
-                }
-              ]
-            }
-          ]
-        }
-        
-        Rules:
-        1. If multiple accounts are detected, list them all.
-        2. **CRITICAL**: The 'balance' field MUST be the total value of the account (e.g. 'Total Account Value', 'Ending Balance', 'Portfolio Value').
-           - If you cannot find an explicit 'Total' line, you MUST calculate the balance by summing the values of the individual holdings.
-           - Ensure the 'balance' is NOT just the value of the first holding found.
-           - The balance should be typically >= the sum of holdings.
-        3. Account Type Mapping (Stricly enforce these values):
-           - "401k": For 401(k), 403(b), 457, or similar employer plans.
-           - "roth_ira": For Roth IRAs (Contributory, Rollover, etc).
-           - "traditional_ira": For Traditional IRAs, SEP IRAs, Simple IRAs, Rollover IRAs.
-           - "hsa": For Health Savings Accounts.
-           - "brokerage": For invalid types, individual/joint taxable accounts, or if unsure.
-        3. Extract holdings for each account. 
-           - **CRITICAL**: Look for columns labeled "Market Value", "Current Value", "Amount", or similar. 
-           - Map this directly to the "amount" field in the JSON.
-           - Do not ignore the dollar value if it is present.
-        4. If a holding has no ticker (e.g. "Cash"), use symbol "CASH" or similar.
-        5. Return RAW JSON only. No markdown formatting.
-        """
+        prompt = _EXTRACTION_PROMPT
 
         provider = (settings.AI_PROVIDER or "google").lower()
         
         try:
             if provider == "ollama":
                 logger.info(f"Extracting with Ollama ({settings.OLLAMA_VISION_MODEL})")
-                return AIService._extract_ollama(file_content, mime_type, prompt)
+                return await AIService._extract_ollama(file_content, mime_type, prompt)
             
             elif provider == "google":
                 api_key = settings.GEMINI_API_KEY
                 if not api_key:
                     logger.warning("GEMINI_API_KEY not found. Skipping Google extraction.")
                     return {"error": "AI service not configured"}
-                return AIService._extract_google(api_key, file_content, mime_type, prompt)
+                return await AIService._extract_google(api_key, file_content, mime_type, prompt)
             
             else:
                  logger.warning(f"Unknown AI provider {provider}")
@@ -236,13 +542,10 @@ class AIService:
             return {"error": str(e)}
 
     @staticmethod
-    def _extract_google(api_key: str, file_content: bytes, mime_type: str, prompt: str) -> dict:
-        from google import genai
+    async def _extract_google(api_key: str, file_content: bytes, mime_type: str, prompt: str) -> dict:
         from google.genai import types
         
-        client = genai.Client(api_key=api_key)
-        
-        response = client.models.generate_content(
+        response = await _google_client(api_key).aio.models.generate_content(
             model=settings.GOOGLE_MODEL,
             contents=[
                 types.Content(
@@ -255,14 +558,12 @@ class AIService:
             ]
         )
         
-        text = response.text.replace('```json', '').replace('```', '').strip()
-        return json.loads(text)
+        text = _CODEFENCE_RE.sub('', response.text).strip()
+        return orjson.loads(text)
 
     @staticmethod
-    def _extract_ollama(file_content: bytes, mime_type: str, prompt: str) -> dict:
+    async def _extract_ollama(file_content: bytes, mime_type: str, prompt: str) -> dict:
         import base64
-        import urllib.request
-        import re
 
         # Encode image to base64
         b64_image = base64.b64encode(file_content).decode('utf-8')
@@ -277,104 +578,98 @@ class AIService:
         }
         
         try:
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
-            with urllib.request.urlopen(req) as response:
-                res_body = response.read().decode('utf-8')
-                res_json = json.loads(res_body)
-                
-                text = res_json.get("response", "").strip()
-                
-                # Strip <think> (DeepSeek)
-                text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL).strip()
-                
-                # Clean Markdown
-                text = text.replace('```json', '').replace('```', '').strip()
-                
-                if not text:
-                     raise ValueError("Empty response from Ollama")
+            response = await _http.post(url, content=orjson.dumps(payload), headers={'Content-Type': 'application/json'})
+            response.raise_for_status()
+            res_json = orjson.loads(response.content)
+            
+            text = _clean_model_text(res_json.get("response", ""))
+            
+            if not text:
+                 raise ValueError("Empty response from Ollama")
 
-                return json.loads(text)
+            return orjson.loads(text)
                 
         except Exception as e:
             logger.error(f"Ollama Extraction Error: {e}")
             raise e
 
     @staticmethod
-    def _generate_google(api_key: str, prompt: str) -> list[dict]:
-        from google import genai
+    async def _generate_google(api_key: str, prompt: str) -> list[dict]:
         try:
-            client = genai.Client(api_key=api_key)
-            response = client.models.generate_content(
+            # Stream the response so chunks are collected while the model is still
+            # generating, rather than waiting on one fully buffered body
+            parts = []
+            async for chunk in await _google_client(api_key).aio.models.generate_content_stream(
                 model=settings.GOOGLE_MODEL,
                 contents=prompt
-            )
-            text = response.text.replace('```json', '').replace('```', '').strip()
-            return json.loads(text)
+            ):
+                if chunk.text:
+                    parts.append(chunk.text)
+            text = _CODEFENCE_RE.sub('', "".join(parts)).strip()
+            return orjson.loads(text)
         except Exception as e:
             logger.error(f"Google AI Error: {e}")
             raise e
 
     @staticmethod
-    def _generate_ollama(prompt: str) -> list[dict]:
-        import urllib.request
-        import urllib.error
-        import re
-        
+    async def _generate_ollama(prompt: str) -> list[dict]:
         url = f"{settings.OLLAMA_BASE_URL}/api/generate"
         payload = {
             "model": settings.OLLAMA_MODEL,
             "prompt": prompt,
-            "stream": False,
+            "stream": True,
             "format": "json"
         }
         
         try:
-            data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
-            with urllib.request.urlopen(req) as response:
-                res_body = response.read().decode('utf-8')
-                res_json = json.loads(res_body)
-                
-                text = res_json.get("response", "").strip()
-                
-                # Strip <think>...</think> (DeepSeek reasoning)
-                text = re.sub(r'<think>.*?</think>', '', text, flags=re.DOTALL).strip()
-                
-                # Clean markdown code blocks
-                text = text.replace('```json', '').replace('```', '').strip()
-                
-                # Check for empty response
-                if not text:
-                    logger.warning("Ollama returned empty text after stripping.")
-                    return []
+            # Streamed as NDJSON chunks: decode each as it arrives instead of
+            # buffering the whole body and parsing it at the end
+            parts = []
+            async with _http.stream("POST", url, content=orjson.dumps(payload), headers={'Content-Type': 'application/json'}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    if "error" in chunk:
+                        raise ValueError(f"Ollama error: {chunk['error']}")
+                    parts.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+            
+            text = _clean_model_text("".join(parts))
+            
+            # Check for empty response
+            if not text:
+                logger.warning("Ollama returned empty text after stripping.")
+                return []
 
-                parsed = json.loads(text)
-                
-                # Check if it was a string that needs DOUBLE parsing (unlikely but possible)
-                if isinstance(parsed, str):
-                    try:
-                        parsed = json.loads(parsed)
-                    except:
-                        pass
-                
-                if isinstance(parsed, dict):
-                    # AI might have returned wrapped object like {"recommendations": [...]}
-                    if "recommendations" in parsed and isinstance(parsed["recommendations"], list):
-                        return parsed["recommendations"]
-                    # Or just a single object? The prompt asks for array.
-                    # If single object, wrap in list
-                    return [parsed]
+            parsed = orjson.loads(text)
+            
+            # Check if it was a string that needs DOUBLE parsing (unlikely but possible)
+            if isinstance(parsed, str):
+                try:
+                    parsed = orjson.loads(parsed)
+                except:
+                    pass
+            
+            if isinstance(parsed, dict):
+                # AI might have returned wrapped object like {"recommendations": [...]}
+                if "recommendations" in parsed and isinstance(parsed["recommendations"], list):
+                    return parsed["recommendations"]
+                # Or just a single object? The prompt asks for array.
+                # If single object, wrap in list
+                return [parsed]
+            
+            if isinstance(parsed, list):
+                return parsed
                 
-                if isinstance(parsed, list):
-                    return parsed
-                    
-                logger.warning(f"Ollama returned unexpected type: {type(parsed)}")
-                return []
+            logger.warning(f"Ollama returned unexpected type: {type(parsed)}")
+            return []
                 
         except Exception as e:
             logger.error(f"Ollama AI Error: {e}")
             # If 404, hint about model
-            if "HTTP Error 404" in str(e):
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
                 logger.error(f"Make sure model '{settings.OLLAMA_MODEL}' is pulled: `ollama pull {settings.OLLAMA_MODEL}`")
             raise e
@@ -1,3 +1,7 @@
+import functools
+from bisect import bisect_left, bisect_right
+
+import numpy as np
 from pydantic import BaseModel
 from typing import Dict, Optional
 
@@ -15,6 +19,33 @@ class ContributionLimits(BaseModel):
     catch_up_ira: float
     catch_up_hsa: float
 
+def _bracket_arrays(brackets):
+    # (Lower, Rate) list -> lower bounds, upper bounds (next lower / inf) and rates as arrays
+    lowers = np.array([b[0] for b in brackets], dtype=float)
+    uppers = np.append(lowers[1:], np.inf)
+    rates = np.array([b[1] for b in brackets], dtype=float)
+    return lowers, uppers, rates
+
+
+def _cumulative_table(brackets):
+    # (Lower, Rate) list -> (thresholds, tax owed at each threshold, rates), so any
+    # amount is base[i] + (x - threshold[i]) * rate[i] for the bracket it falls in
+    thresholds = tuple(float(b[0]) for b in brackets)
+    rates = tuple(b[1] for b in brackets)
+    bases = [0.0]
+    for i in range(1, len(brackets)):
+        bases.append(bases[-1] + (thresholds[i] - thresholds[i - 1]) * rates[i - 1])
+    return thresholds, tuple(bases), rates
+
+
+def _cumulative_tax(table, amount: float) -> float:
+    thresholds, bases, rates = table
+    if amount <= 0:
+        return 0.0
+    i = bisect_right(thresholds, amount) - 1
+    return bases[i] + (amount - thresholds[i]) * rates[i]
+
+
 class FinancialAssumptionsService:
     """
     Service to provide financial assumptions such as tax rates, contribution limits,
@@ -52,6 +83,11 @@ class FinancialAssumptionsService:
         115: 2.9 # And older
     }
 
+    # Same table indexed directly by age (0.0 below the first entry), for a plain
+    # index instead of a hash lookup; the numpy copy serves vectors of ages
+    _RMD_DIVISORS = (0.0,) * 72 + tuple(map(RMD_UNIFORM_LIFETIME_TABLE.get, range(72, 116)))
+    _RMD_DIVISORS_NP = np.array(_RMD_DIVISORS)
+
     # 2024 Tax Brackets & Rules
     # Source: IRS Rev. Proc. 2023-34
     
@@ -61,6 +97,14 @@ class FinancialAssumptionsService:
         "head_household": 21900
     }
 
+    # Filing status as callers commonly spell it -> canonical key, so the hot tax paths
+    # are one dict hit instead of lower() + membership test + fallback
+    _FILING_STATUS = {
+        "single": "single", "Single": "single", "SINGLE": "single",
+        "married_jointly": "married_jointly", "Married_Jointly": "married_jointly", "MARRIED_JOINTLY": "married_jointly",
+        "head_household": "head_household", "Head_Household": "head_household", "HEAD_HOUSEHOLD": "head_household",
+    }
+
     # Brackets: (Threshold, Rate) - Cumulative
     # "If income > Threshold, apply Rate to (Income - Threshold) + BaseTax" logic usually?
     # Or simpler: List of tuples (Upper Limit, Rate).
@@ -102,6 +146,14 @@ class FinancialAssumptionsService:
         ]
     }
 
+    # Cumulative form of the brackets for the scalar calculators (one bisect per lookup)
+    _TAX_CUMULATIVE = {status: _cumulative_table(b) for status, b in TAX_BRACKETS_2024.items()}
+    _CAP_GAINS_CUMULATIVE = {status: _cumulative_table(b) for status, b in CAP_GAINS_BRACKETS_2024.items()}
+
+    # Array form of the brackets for the batch (numpy) calculators
+    _TAX_BRACKET_ARRAYS = {status: _bracket_arrays(b) for status, b in TAX_BRACKETS_2024.items()}
+    _CAP_GAINS_BRACKET_ARRAYS = {status: _bracket_arrays(b) for status, b in CAP_GAINS_BRACKETS_2024.items()}
+
     def get_tax_rates(self, year: int) -> TaxRates:
         """
         Returns tax rate assumptions for a given year.
@@ -110,52 +162,33 @@ class FinancialAssumptionsService:
         # In a real system, we might project tax reform or changes.
         return self.DEFAULT_TAX_RATES
 
+    def _normalize_filing_status(self, filing_status: str) -> str:
+        status = self._FILING_STATUS.get(filing_status)
+        if status is None:
+            # Unusual casing or unknown status: same rules as before, default to single
+            status = filing_status.lower()
+            if status not in self.STANDARD_DEDUCTION_2024:
+                status = "single"
+        return status
+
     def calculate_federal_income_tax(self, gross_ordinary_income: float, filing_status: str) -> float:
         """
         Calculates 2024 Federal Income Tax using progressive brackets.
         Subtracts Standard Deduction automatically.
         """
-        status = filing_status.lower()
-        if status not in self.STANDARD_DEDUCTION_2024:
-            status = "single" # Default
-
+        status = self._normalize_filing_status(filing_status)
         std_deduction = self.STANDARD_DEDUCTION_2024[status]
         taxable_income = max(0, gross_ordinary_income - std_deduction)
         
-        brackets = self.TAX_BRACKETS_2024.get(status, self.TAX_BRACKETS_2024["single"])
-        
-        tax = 0.0
-        # Brackets are (Lower, Rate)
-        # We need to calculate checks between brackets.
-        
-        for i, (current_min, rate) in enumerate(brackets):
-            # Determine range of this bracket
-            # Next bracket start is the ceiling of this bracket
-            if i < len(brackets) - 1:
-                next_min = brackets[i+1][0]
-                bracket_cap = next_min
-            else:
-                bracket_cap = float('inf')
-                
-            # How much income falls in this bracket?
-            if taxable_income > current_min:
-                # Amount in this bracket is min(taxable, cap) - current_min
-                subject_to_tax = min(taxable_income, bracket_cap) - current_min
-                tax += subject_to_tax * rate
-            else:
-                break
-                
-        return tax
+        table = self._TAX_CUMULATIVE.get(status, self._TAX_CUMULATIVE["single"])
+        return _cumulative_tax(table, taxable_income)
 
     def calculate_capital_gains_tax(self, gross_ordinary_income: float, long_term_gains: float, filing_status: str) -> float:
         """
         Calculates Capital Gains Tax.
         Cap Gains sit ON TOP of Ordinary Income for bracket determination.
         """
-        status = filing_status.lower()
-        if status not in self.STANDARD_DEDUCTION_2024:
-            status = "single"
-
+        status = self._normalize_filing_status(filing_status)
         std_deduction = self.STANDARD_DEDUCTION_2024[status]
         
         # Taxable Ordinary Income (floor for cap gains stacking)
@@ -164,50 +197,52 @@ class FinancialAssumptionsService:
         # Total Taxable Income (for determining cap gains bracket)
         total_taxable = taxable_ordinary + long_term_gains
         
-        brackets = self.CAP_GAINS_BRACKETS_2024.get(status, self.CAP_GAINS_BRACKETS_2024["single"])
-        
-        tax = 0.0
-        
-        for i, (current_min, rate) in enumerate(brackets):
-            if i < len(brackets) - 1:
-                next_min = brackets[i+1][0]
-                bracket_cap = next_min
-            else:
-                bracket_cap = float('inf')
-                
-            # We are looking for the portion of the "Stack" that represents the Cap Gains.
-            # The stack is from `taxable_ordinary` to `total_taxable`.
-            
-            # Intersection of [taxable_ordinary, total_taxable] AND [current_min, bracket_cap]
-            
-            # Start of segment
-            seg_start = max(taxable_ordinary, current_min)
-            # End of segment
-            seg_end = min(total_taxable, bracket_cap)
-            
-            if seg_end > seg_start:
-                tax += (seg_end - seg_start) * rate
-                
-        return tax
+        # The gains occupy the stack from taxable_ordinary up to total_taxable, so their tax
+        # is the cumulative tax at the top minus the cumulative tax at the floor
+        table = self._CAP_GAINS_CUMULATIVE.get(status, self._CAP_GAINS_CUMULATIVE["single"])
+        return max(0.0, _cumulative_tax(table, total_taxable) - _cumulative_tax(table, taxable_ordinary))
+
+    def calculate_federal_income_tax_batch(self, gross_ordinary_incomes, filing_status: str) -> np.ndarray:
+        """
+        Vectorized calculate_federal_income_tax for many incomes (same filing status),
+        e.g. a whole projection grid or Monte Carlo path set at once.
+        """
+        status = self._normalize_filing_status(filing_status)
+        lowers, uppers, rates = self._TAX_BRACKET_ARRAYS.get(status, self._TAX_BRACKET_ARRAYS["single"])
+        incomes = np.asarray(gross_ordinary_incomes, dtype=float)
+        taxable = np.maximum(incomes - self.STANDARD_DEDUCTION_2024[status], 0.0)
+
+        # Amount of income falling inside each bracket, then one matvec against the rates
+        in_bracket = np.clip(taxable[..., None] - lowers, 0.0, uppers - lowers)
+        return in_bracket @ rates
+
+    def calculate_capital_gains_tax_batch(self, gross_ordinary_incomes, long_term_gains, filing_status: str) -> np.ndarray:
+        """
+        Vectorized calculate_capital_gains_tax. Inputs broadcast against each other.
+        """
+        status = self._normalize_filing_status(filing_status)
+        lowers, uppers, rates = self._CAP_GAINS_BRACKET_ARRAYS.get(status, self._CAP_GAINS_BRACKET_ARRAYS["single"])
+        incomes, gains = np.broadcast_arrays(
+            np.asarray(gross_ordinary_incomes, dtype=float), np.asarray(long_term_gains, dtype=float)
+        )
+        taxable_ordinary = np.maximum(incomes - self.STANDARD_DEDUCTION_2024[status], 0.0)
+        total_taxable = taxable_ordinary + gains
+
+        # Intersection of the gains "stack" [ordinary, total] with each bracket
+        seg_start = np.maximum(taxable_ordinary[..., None], lowers)
+        seg_end = np.minimum(total_taxable[..., None], uppers)
+        return np.maximum(seg_end - seg_start, 0.0) @ rates
 
     def get_marginal_rate(self, gross_ordinary_income: float, filing_status: str) -> float:
         """Helper to get marginal ordinary rate"""
-        status = filing_status.lower()
-        if status not in self.STANDARD_DEDUCTION_2024:
-            status = "single"
-            
+        status = self._normalize_filing_status(filing_status)
         std_deduction = self.STANDARD_DEDUCTION_2024[status]
         taxable_income = max(0, gross_ordinary_income - std_deduction)
         
-        brackets = self.TAX_BRACKETS_2024.get(status, self.TAX_BRACKETS_2024["single"])
-        # Find the highest bracket we are in
-        current_rate = 0.0
-        for thresh, rate in brackets:
-            if taxable_income > thresh:
-                current_rate = rate
-            else:
-                break
-        return current_rate
+        # Highest bracket whose threshold we are strictly above
+        thresholds, _, rates = self._TAX_CUMULATIVE.get(status, self._TAX_CUMULATIVE["single"])
+        i = bisect_left(thresholds, taxable_income) - 1
+        return rates[i] if i >= 0 else 0.0
 
     def get_contribution_limits(self, year: int) -> ContributionLimits:
         """
@@ -217,11 +252,8 @@ class FinancialAssumptionsService:
         # In reality, these index with inflation.
         return self.DEFAULT_CONTRIBUTION_LIMITS
 
-    def get_rmd_divisor(self, age: int, birth_year: Optional[int] = None) -> float:
-        """
-        Returns the RMD divisor for a given age based on the IRS Uniform Lifetime Table.
-        Incorporates SECURE 2.0 Act RMD age changes based on birth year.
-        """
+    @staticmethod
+    def _rmd_start_age(birth_year: Optional[int]) -> int:
         # Determine RMD Start Age based on SECURE 2.0
         rmd_start_age = 73 # Default fallback (1951-1959 cohort is current transition)
         
@@ -232,15 +264,33 @@ class FinancialAssumptionsService:
                 rmd_start_age = 73
             else: # 1960 or later
                 rmd_start_age = 75
-        
-        if age < rmd_start_age:
+        return rmd_start_age
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_rmd_divisor(age: int, birth_year: Optional[int] = None) -> float:
+        """
+        Returns the RMD divisor for a given age based on the IRS Uniform Lifetime Table.
+        Incorporates SECURE 2.0 Act RMD age changes based on birth year.
+        Pure function of (age, birth_year), so it's memoized for the yearly projection loop.
+        """
+        if age < FinancialAssumptionsService._rmd_start_age(birth_year):
             # Technically you can take it earlier but it's not "Required"
             # Divisor logic usually implies the minimum needed.
             return 0.0
             
-        # If age is in table, use it. If strictly older than table, use last value (simplified)
+        # If strictly older than table, use last value (simplified)
         # or extrapolated. The table usually goes up to 120+. 115 is 2.9.
         if age >= 115:
             return 2.9
             
-        return self.RMD_UNIFORM_LIFETIME_TABLE.get(age, 27.4)
+        return FinancialAssumptionsService._RMD_DIVISORS[age]
+
+    def get_rmd_divisor_batch(self, ages, birth_year: Optional[int] = None) -> np.ndarray:
+        """
+        Vectorized get_rmd_divisor for a vector of ages (same birth year), e.g. every
+        year of a projection at once.
+        """
+        ages = np.asarray(ages, dtype=int)
+        divisors = self._RMD_DIVISORS_NP[np.clip(ages, 0, 115)]
+        return np.where(ages < self._rmd_start_age(birth_year), 0.0, divisors)
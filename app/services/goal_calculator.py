@@ -1,5 +1,27 @@
+from enum import Enum
+from typing import Optional, Union
+
 from app.models.user import User
 
+
+class GoalType(str, Enum):
+    """
+    Goal types the calculator knows how to auto-fill (the frontend's goalTypeHint).
+    A str enum, so members and the raw hint strings hash and compare the same.
+    """
+    EMERGENCY_FUND = "EMERGENCY_FUND"
+    RETIREMENT_401K = "RETIREMENT_401K"
+    DEBT_PAYOFF = "DEBT_PAYOFF"
+    MORTGAGE_PAYOFF = "MORTGAGE_PAYOFF"
+    ADDITIONAL_INCOME = "ADDITIONAL_INCOME"
+    HEALTH_SAVINGS = "HEALTH_SAVINGS"
+
+    @classmethod
+    def classify(cls, hint: Optional[str]) -> Optional["GoalType"]:
+        # Resolve a hint once, up front; unknown hints have no calculator support
+        return cls._value2member_map_.get(hint) if hint else None
+
+
 class GoalCalculator:
     """
     Utility service for dynamically calculating goal progress and targets.
@@ -13,7 +35,17 @@ class GoalCalculator:
         return float(d.get(key) or 0)
 
     @staticmethod
-    def calculate_initial_values(user: User, goal_type: str) -> dict:
+    def _sum_vals(user: User, category: str, *keys: str) -> float:
+        # Resolve the category dict once for several keys instead of once per key
+        d = getattr(user, category, {}) or {}
+        _float = float
+        total = 0.0
+        for key in keys:
+            total += _float(d.get(key) or 0)
+        return total
+
+    @staticmethod
+    def calculate_initial_values(user: User, goal_type: Union[GoalType, str, None]) -> dict:
         """
         Calculates the initial 'currentAmount' and default 'targetAmount' for a new goal.
         
@@ -26,59 +58,14 @@ class GoalCalculator:
         Returns:
             dict: {"currentAmount": float, "targetAmount": float}
         """
-        result = {"currentValue": 0.0, "targetValue": 100.0}
-        
-        if not goal_type:
-            return result
-            
-        # 1. Emergency Fund
-        if goal_type == "EMERGENCY_FUND":
-            monthly_expenses = GoalCalculator._get_val(user, "expenses", "totalMonthlyExpenses")
-            if monthly_expenses == 0: monthly_expenses = 4000.0
-            target = monthly_expenses * 6 # Aim for 6 months
-            current = GoalCalculator._get_val(user, "assets", "savingsBalance") + GoalCalculator._get_val(user, "assets", "checkingBalance")
-            
-            result["targetValue"] = target
-            result["currentValue"] = current
-            
-        # 2. Max 401(k)
-        elif goal_type == "RETIREMENT_401K":
-            result["targetValue"] = 23000.0 # 2024 Limit
-            result["currentValue"] = GoalCalculator._get_val(user, "assets", "retirementAccount401kContribution")
-            
-            # 3. Pay Off Debt
-        elif goal_type == "DEBT_PAYOFF":
-            # High Interest Debt Only (Exclude Mortgage)
-            credit_cards = GoalCalculator._get_val(user, "liabilities", "creditCardDebt")
-            student_loans = GoalCalculator._get_val(user, "liabilities", "studentLoanDebt")
-            other_debt = GoalCalculator._get_val(user, "liabilities", "otherDebt")
-            
-            # Track ONLY High Interest Debt
-            total_debt = credit_cards + student_loans + other_debt
-            
-            result["targetValue"] = total_debt if total_debt > 0 else 1000.0
-            result["currentValue"] = 0.0
-            
-        # 4. Pay off Mortgage
-        elif goal_type == "MORTGAGE_PAYOFF":
-             mortgage_balance = GoalCalculator._get_val(user, "liabilities", "mortgageBalance")
-             result["targetValue"] = mortgage_balance if mortgage_balance > 0 else 250000.0
-             result["currentValue"] = 0.0
-             
-        # 5. Additional Income
-        elif goal_type == "ADDITIONAL_INCOME":
-             result["targetValue"] = 2000.0 
-             result["currentValue"] = GoalCalculator._get_val(user, "income", "otherIncomeAmount1") + GoalCalculator._get_val(user, "income", "otherIncomeAmount2")
-
-        # 6. HSA Goal
-        elif goal_type == "HEALTH_SAVINGS":
-             result["targetValue"] = 10000.0
-             result["currentValue"] = GoalCalculator._get_val(user, "assets", "hsaBalance") + GoalCalculator._get_val(user, "assets", "spouseHsaBalance")
-             
-        return result
-
-    @staticmethod
-    def calculate_current_progress(user: User, user_goal_target: float, goal_type: str) -> float:
+        handler = _INITIAL_HANDLERS.get(goal_type) if goal_type else None
+        if handler is None:
+            return {"currentValue": 0.0, "targetValue": 100.0}
+        target, current = handler(user)
+        return {"currentValue": current, "targetValue": target}
+
+    @staticmethod
+    def calculate_current_progress(user: User, user_goal_target: float, goal_type: Union[GoalType, str, None]) -> float:
         """
         Calculates the *current amount* (progress) based on live user data.
         
@@ -91,34 +78,90 @@ class GoalCalculator:
         Returns:
             float: The calculated current amount.
         """
-        if not goal_type:
+        handler = _PROGRESS_HANDLERS.get(goal_type) if goal_type else None
+        if handler is None:
             return 0.0
+        return handler(user, user_goal_target)
 
-        if goal_type == "EMERGENCY_FUND":
-            return GoalCalculator._get_val(user, "assets", "savingsBalance") + GoalCalculator._get_val(user, "assets", "checkingBalance")
-        
-        elif goal_type == "RETIREMENT_401K":
-            return GoalCalculator._get_val(user, "assets", "retirementAccount401kContribution")
-            
-        elif goal_type == "DEBT_PAYOFF":
-            credit_cards = GoalCalculator._get_val(user, "liabilities", "creditCardDebt")
-            student_loans = GoalCalculator._get_val(user, "liabilities", "studentLoanDebt")
-            other_debt = GoalCalculator._get_val(user, "liabilities", "otherDebt")
-            
-            current_total_debt = credit_cards + student_loans + other_debt
-            
-            paid_off = user_goal_target - current_total_debt
-            return max(0.0, paid_off) # Ensure not negative if debt increases
-
-        elif goal_type == "MORTGAGE_PAYOFF":
-            current_mortgage = GoalCalculator._get_val(user, "liabilities", "mortgageBalance")
-            paid_off = user_goal_target - current_mortgage
-            return max(0.0, paid_off)
-            
-        elif goal_type == "ADDITIONAL_INCOME":
-             return GoalCalculator._get_val(user, "income", "otherIncomeAmount1") + GoalCalculator._get_val(user, "income", "otherIncomeAmount2")
-
-        elif goal_type == "HEALTH_SAVINGS":
-             return GoalCalculator._get_val(user, "assets", "hsaBalance") + GoalCalculator._get_val(user, "assets", "spouseHsaBalance")
-
-        return 0.0
+    # --- Initial values: (user) -> (targetValue, currentValue) ---
+
+    @staticmethod
+    def _init_emergency_fund(user: User) -> tuple[float, float]:
+        monthly_expenses = GoalCalculator._get_val(user, "expenses", "totalMonthlyExpenses")
+        if monthly_expenses == 0: monthly_expenses = 4000.0
+        target = monthly_expenses * 6 # Aim for 6 months
+        return target, GoalCalculator._cash(user)
+
+    @staticmethod
+    def _init_retirement_401k(user: User) -> tuple[float, float]:
+        return 23000.0, GoalCalculator._get_val(user, "assets", "retirementAccount401kContribution") # 2024 Limit
+
+    @staticmethod
+    def _init_debt_payoff(user: User) -> tuple[float, float]:
+        # Track ONLY High Interest Debt (Exclude Mortgage)
+        total_debt = GoalCalculator._high_interest_debt(user)
+        return (total_debt if total_debt > 0 else 1000.0), 0.0
+
+    @staticmethod
+    def _init_mortgage_payoff(user: User) -> tuple[float, float]:
+        mortgage_balance = GoalCalculator._get_val(user, "liabilities", "mortgageBalance")
+        return (mortgage_balance if mortgage_balance > 0 else 250000.0), 0.0
+
+    @staticmethod
+    def _init_additional_income(user: User) -> tuple[float, float]:
+        return 2000.0, GoalCalculator._other_income(user)
+
+    @staticmethod
+    def _init_health_savings(user: User) -> tuple[float, float]:
+        return 10000.0, GoalCalculator._hsa(user)
+
+    # --- Live progress: (user, goal target) -> currentValue ---
+
+    @staticmethod
+    def _progress_debt_payoff(user: User, user_goal_target: float) -> float:
+        paid_off = user_goal_target - GoalCalculator._high_interest_debt(user)
+        return max(0.0, paid_off) # Ensure not negative if debt increases
+
+    @staticmethod
+    def _progress_mortgage_payoff(user: User, user_goal_target: float) -> float:
+        paid_off = user_goal_target - GoalCalculator._get_val(user, "liabilities", "mortgageBalance")
+        return max(0.0, paid_off)
+
+    # --- Shared balances ---
+
+    @staticmethod
+    def _cash(user: User) -> float:
+        return GoalCalculator._sum_vals(user, "assets", "savingsBalance", "checkingBalance")
+
+    @staticmethod
+    def _high_interest_debt(user: User) -> float:
+        return GoalCalculator._sum_vals(user, "liabilities", "creditCardDebt", "studentLoanDebt", "otherDebt")
+
+    @staticmethod
+    def _other_income(user: User) -> float:
+        return GoalCalculator._sum_vals(user, "income", "otherIncomeAmount1", "otherIncomeAmount2")
+
+    @staticmethod
+    def _hsa(user: User) -> float:
+        return GoalCalculator._sum_vals(user, "assets", "hsaBalance", "spouseHsaBalance")
+
+
+# goal type -> handler, so each call is one dict lookup instead of an elif chain
+# (keyed by GoalType; raw hint strings hit the same entries)
+_INITIAL_HANDLERS = {
+    GoalType.EMERGENCY_FUND: GoalCalculator._init_emergency_fund,
+    GoalType.RETIREMENT_401K: GoalCalculator._init_retirement_401k,
+    GoalType.DEBT_PAYOFF: GoalCalculator._init_debt_payoff,
+    GoalType.MORTGAGE_PAYOFF: GoalCalculator._init_mortgage_payoff,
+    GoalType.ADDITIONAL_INCOME: GoalCalculator._init_additional_income,
+    GoalType.HEALTH_SAVINGS: GoalCalculator._init_health_savings,
+}
+
+_PROGRESS_HANDLERS = {
+    GoalType.EMERGENCY_FUND: lambda user, target: GoalCalculator._cash(user),
+    GoalType.RETIREMENT_401K: lambda user, target: GoalCalculator._get_val(user, "assets", "retirementAccount401kContribution"),
+    GoalType.DEBT_PAYOFF: GoalCalculator._progress_debt_payoff,
+    GoalType.MORTGAGE_PAYOFF: GoalCalculator._progress_mortgage_payoff,
+    GoalType.ADDITIONAL_INCOME: lambda user, target: GoalCalculator._other_income(user),
+    GoalType.HEALTH_SAVINGS: lambda user, target: GoalCalculator._hsa(user),
+}
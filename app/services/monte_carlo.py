@@ -1,13 +1,123 @@
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the numpy path below is used without it
+    njit = None
+
+try:
+    import cupy as cp
+except ImportError:  # cupy is optional; only very large runs would use the GPU
+    cp = None
+
+# Below this many paths the host<->device overhead outweighs the GPU speedup
+GPU_MIN_SIMULATIONS = 50_000
+
 class SimulationResult(BaseModel):
     percentiles: Dict[str, List[float]]  # "10th", "50th", "90th" -> list of balances by year
     success_rate: float
     median_ending_balance: float
     years: List[int]
 
+class SimulationParams(BaseModel):
+    # One user's inputs to run_simulation, for run_simulation_batch
+    current_balance: float
+    annual_contribution: float
+    years_to_retirement: int
+    total_years: int
+    annual_withdrawal: float
+    risk_profile: str = "moderate"
+    num_simulations: int = 1000
+
+# Risk profile -> (mu, sigma) of annual returns
+_PROFILES = {
+    "conservative": (0.05, 0.06),
+    "moderate": (0.07, 0.12),
+    "aggressive": (0.09, 0.18)
+}
+
+# One PCG64 Generator for the process instead of the legacy global RandomState;
+# pass a seed to run_simulation for an independent, reproducible stream
+_rng = np.random.default_rng()
+
+
+def _simulate_numpy(current_balance: float, mu: float, sigma: float, cashflow: np.ndarray, num_simulations: int, rng: np.random.Generator = _rng) -> np.ndarray:
+    total_years = cashflow.shape[0]
+
+    # Draw every year's returns in one RNG call (float32 straight from the generator; the
+    # transpose of a (years, paths) draw is the column-major (paths, years) matrix), then
+    # turn them into growth factors 1 + N(mu, sigma) in place
+    growth = rng.standard_normal((total_years, num_simulations), dtype=np.float32).T
+    growth *= sigma
+    growth += 1.0 + mu
+    
+    # float32 halves the bytes per step (plenty of precision for dollar balances), and
+    # column-major keeps each year's column contiguous for the read t / write t+1 walk
+    sim_balances = np.empty((num_simulations, total_years + 1), dtype=np.float32, order='F')
+    sim_balances[:, 0] = current_balance
+    
+    # A balance can only turn negative in a withdrawal year, on a worse-than -100% draw,
+    # or from a negative starting balance; every other year skips the clamp pass
+    needs_clamp = (cashflow < 0) | (growth.min(axis=0) < 0)
+    if current_balance < 0:
+        needs_clamp[0] = True
+    
+    for t in range(total_years):
+        nxt = sim_balances[:, t + 1]
+        np.multiply(sim_balances[:, t], growth[:, t], out=nxt)
+        nxt += cashflow[t]
+        if needs_clamp[t]:
+            # Clamp to 0 (Bankruptcy)
+            np.maximum(nxt, 0, out=nxt)
+    return sim_balances
+
+
+if njit is not None:
+    # Explicit signature: compiled eagerly at import (and loaded from the on-disk cache after
+    # the first run) instead of JIT-compiling inside the first request. run_simulation always
+    # passes these exact types.
+    @njit("float32[:, ::1](float64, float64, float64, float32[::1], int64)", parallel=True, fastmath=True, cache=True)
+    def _simulate_numba(current_balance, mu, sigma, cashflow, num_simulations):
+        # Paths are independent, so parallelize across them and walk each path's
+        # years sequentially in registers
+        total_years = cashflow.shape[0]
+        # Accumulate each path in float64 registers, store float32 like the numpy path
+        # (row-major here: each thread writes its own path's row)
+        sim_balances = np.empty((num_simulations, total_years + 1), dtype=np.float32)
+        for i in prange(num_simulations):
+            bal = current_balance
+            sim_balances[i, 0] = bal
+            for t in range(total_years):
+                bal = bal * (1.0 + np.random.normal(mu, sigma)) + cashflow[t]
+                if bal < 0.0:
+                    bal = 0.0  # Bankruptcy
+                sim_balances[i, t + 1] = bal
+        return sim_balances
+else:
+    _simulate_numba = None
+
+
+def _simulate_cupy(current_balance: float, mu: float, sigma: float, cashflow: np.ndarray, num_simulations: int, seed: Optional[int] = None):
+    # Same walk as _simulate_numpy, on the device. Year-major so each step is a contiguous
+    # row; the result stays on the GPU (as a (paths, years) view) for _summarize
+    total_years = cashflow.shape[0]
+    growth = cp.random.default_rng(seed).standard_normal((total_years, num_simulations), dtype=cp.float32)
+    growth *= sigma
+    growth += 1.0 + mu
+    
+    sim_balances = cp.empty((total_years + 1, num_simulations), dtype=cp.float32)
+    sim_balances[0] = current_balance
+    for t in range(total_years):
+        nxt = sim_balances[t + 1]
+        cp.multiply(sim_balances[t], growth[t], out=nxt)
+        nxt += float(cashflow[t])
+        # Clamp to 0 (Bankruptcy)
+        cp.maximum(nxt, 0, out=nxt)
+    return sim_balances.T
+
+
 class MonteCarloService:
     @staticmethod
     def run_simulation(
@@ -17,7 +127,8 @@ class MonteCarloService:
         total_years: int,
         annual_withdrawal: float,
         risk_profile: str = "moderate",
-        num_simulations: int = 1000
+        num_simulations: int = 1000,
+        seed: Optional[int] = None
     ) -> SimulationResult:
         """
         Runs a Monte Carlo simulation to project future portfolio outcomes.
@@ -30,52 +141,106 @@ class MonteCarloService:
             risk_profile (str): Determines the mean (mu) and volatility (sigma) of returns.
                 - Conservative: Lower growth, lower volatility.
                 - Aggressive: Higher potential growth, higher volatility.
+            seed (int, optional): Makes the run reproducible (uses the numpy or GPU kernel).
                 
         Returns:
             SimulationResult: success rates, median balances, and 10th/90th percentile outcomes.
         """
-        # Determine strict market parameters based on risk profile
-        profiles = {
-            "conservative": (0.05, 0.06),
-            "moderate": (0.07, 0.12),
-            "aggressive": (0.09, 0.18)
-        }
+        mu, sigma = MonteCarloService._market_params(risk_profile)
         
-        mu, sigma = profiles.get(risk_profile.lower(), profiles["moderate"])
+        # Fold the phase logic into a per-year cashflow: contribution while accumulating,
+        # minus the withdrawal after (grow then withdraw / contribute, as before)
+        years = np.arange(1, total_years + 1)
+        cashflow = np.where(years <= years_to_retirement, annual_contribution, -annual_withdrawal).astype(np.float32)
         
-        # Initialize simulation array
-        sim_balances = np.zeros((num_simulations, total_years + 1))
-        sim_balances[:, 0] = current_balance
-        
-        for t in range(1, total_years + 1):
-            # Generate random returns
-            returns = np.random.normal(mu, sigma, num_simulations)
+        if cp is not None and num_simulations >= GPU_MIN_SIMULATIONS:
+            sim_balances = _simulate_cupy(float(current_balance), mu, sigma, cashflow, num_simulations, seed)
+        elif seed is not None:
+            # numba's parallel per-thread streams aren't reproducible, so seeded runs stay on numpy
+            sim_balances = _simulate_numpy(float(current_balance), mu, sigma, cashflow, num_simulations, np.random.default_rng(seed))
+        elif _simulate_numba is not None:
+            sim_balances = _simulate_numba(float(current_balance), mu, sigma, cashflow, num_simulations)
+        else:
+            sim_balances = _simulate_numpy(float(current_balance), mu, sigma, cashflow, num_simulations)
             
-            # Phase logic
-            if t <= years_to_retirement:
-                 # Accumulation: Add contribution
-                 sim_balances[:, t] = sim_balances[:, t-1] * (1 + returns) + annual_contribution
-            else:
-                 # Decumulation: Subtract withdrawal (Assume withdrawal happens at start of year for safety?)
-                 # Standard is usually end of year or mid-year.
-                 # Let's do: Grow then withdraw.
-                 sim_balances[:, t] = sim_balances[:, t-1] * (1 + returns) - annual_withdrawal
-                 
-            # Clamp to 0 (Bankruptcy)
-            sim_balances[:, t] = np.maximum(sim_balances[:, t], 0)
-            
-        # Analyze results
-        percentiles = {}
-        for p in [10, 50, 90]:
-            ts = np.percentile(sim_balances, p, axis=0)
-            percentiles[f"{p}th"] = ts.tolist()
+        return MonteCarloService._summarize(sim_balances, total_years, num_simulations)
+
+    @staticmethod
+    def run_simulation_batch(params: List[SimulationParams], seed: Optional[int] = None) -> List[SimulationResult]:
+        """
+        Runs run_simulation for many users at once (e.g. a dashboard refresh).
+
+        All users share one (years, users, paths) tensor: returns are drawn in a single
+        RNG call and each year is one broadcast step across every user's paths. Users
+        with shorter horizons or fewer simulations read back the leading slice of
+        their block.
+        """
+        if not params:
+            return []
+
+        n_users = len(params)
+        n_years = max(p.total_years for p in params)
+        n_paths = max(p.num_simulations for p in params)
+
+        market = np.array([MonteCarloService._market_params(p.risk_profile) for p in params], dtype=np.float32)
+        mu, sigma = market[:, 0], market[:, 1]
+        balances = np.array([p.current_balance for p in params], dtype=np.float32)
+
+        # (years, users) cashflow; zero past a user's own horizon (those years are never read)
+        years = np.arange(1, n_years + 1)[:, None]
+        ytr = np.array([p.years_to_retirement for p in params])
+        horizon = np.array([p.total_years for p in params])
+        contrib = np.array([p.annual_contribution for p in params], dtype=np.float32)
+        withdraw = np.array([p.annual_withdrawal for p in params], dtype=np.float32)
+        cashflow = np.where(years <= ytr, contrib, -withdraw)
+        cashflow[years > horizon] = 0.0
+        cashflow = cashflow.astype(np.float32)
+
+        # Growth factors 1 + N(mu, sigma), per user, in one draw
+        rng = np.random.default_rng(seed) if seed is not None else _rng
+        growth = rng.standard_normal((n_years, n_users, n_paths), dtype=np.float32)
+        growth *= sigma[:, None]
+        growth += (1.0 + mu)[:, None]
+
+        # Year-major so each step reads/writes one contiguous (users, paths) slab
+        sim = np.empty((n_years + 1, n_users, n_paths), dtype=np.float32)
+        sim[0] = balances[:, None]
+        for t in range(n_years):
+            nxt = sim[t + 1]
+            np.multiply(sim[t], growth[t], out=nxt)
+            nxt += cashflow[t][:, None]
+            np.maximum(nxt, 0, out=nxt)  # Bankruptcy
+
+        return [
+            MonteCarloService._summarize(sim[: p.total_years + 1, u, : p.num_simulations].T, p.total_years, p.num_simulations)
+            for u, p in enumerate(params)
+        ]
+
+    @staticmethod
+    def _market_params(risk_profile: str) -> tuple:
+        # Determine strict market parameters based on risk profile
+        return _PROFILES.get(risk_profile.lower(), _PROFILES["moderate"])
+
+    @staticmethod
+    def _summarize(sim_balances: np.ndarray, total_years: int, num_simulations: int) -> SimulationResult:
+        # sim_balances: (num_simulations, total_years + 1), numpy or (GPU runs) cupy
+        xp = cp.get_array_module(sim_balances) if cp is not None else np
+        # Analyze results: all three percentiles from a single partition pass
+        pct = xp.percentile(sim_balances, [10, 50, 90], axis=0)
+        if xp is not np:
+            pct = pct.get()  # only the small (3, years) summary leaves the device
+        # One conversion for all three rows, rounded to cents: the float32 balances would
+        # otherwise serialize with a long tail of meaningless digits
+        p10, p50, p90 = pct.astype(np.float64).round(2).tolist()
+        percentiles = {"10th": p10, "50th": p50, "90th": p90}
             
         # Success Rate: % of runs that did NOT hit 0 at the end (or anywhere? usually "at end of plan")
         # Assuming we clamp to 0, check if balance > 0
-        success_count = np.sum(sim_balances[:, -1] > 0)
-        success_rate = (success_count / num_simulations) * 100.0
+        final = sim_balances[:, -1]
+        success_rate = int(xp.count_nonzero(final > 0)) * (100.0 / num_simulations)
         
-        median_ending = np.median(sim_balances[:, -1])
+        # Median of the final year is already the last point of the 50th percentile row
+        median_ending = p50[-1]
         
         return SimulationResult(
             percentiles=percentiles,
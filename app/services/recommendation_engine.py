@@ -1,431 +1,697 @@
-from typing import List, Dict, Any
+import copy
+import logging
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.models.action_item import UserActionItem
+from app.models.goal import UserGoal
 from app.models.user import User
 from app.models.retirement import RetirementPlan, AnnualSnapshot
+from app.services.goal_calculator import GoalCalculator, GoalType
 # (No extra imports needed here as we import AIService locally inside the method to avoid circular deps if any)
 
+logger = logging.getLogger(__name__)
+
+# Titles that suppress a rule when the user already has a goal/action by that name.
+# Matching is on the full title, case-insensitive, so these are pre-lowercased.
+_T_SAVINGS = "boost your savings rate"
+_T_SAVINGS_MED = "increase savings to 20%"
+_T_EF = "emergency fund"
+_T_BUILD_EF = "build emergency fund"
+_T_MAX_401K_A = "max 401(k)"
+_T_MAX_401K_B = "maximize 401(k)"
+_T_CONS = "portfolio too conservative?"
+_T_AGG = "portfolio too aggressive?"
+_T_BEN = "review beneficiaries"
+
+# Last results per input fingerprint, so repeated dashboard loads with unchanged inputs
+# skip the rules, the AI context build and the AI cache lookups entirely
+RESULT_MEMO_TTL = 300  # seconds; keeps background AI refreshes from being hidden for long
+RESULT_MEMO_MAX_ENTRIES = 512
+# Entries are private deep copies held in tuples; hits hand out fresh deep copies, so a
+# caller mutating its result can't change what later hits see
+_result_memo: "OrderedDict[tuple, tuple[float, tuple[dict, ...]]]" = OrderedDict()
+
+
+def _fingerprint(user: User, plan: RetirementPlan, portfolio: Dict[str, Any], goals_lc: frozenset, actions_lc: frozenset) -> tuple:
+    # Everything generate_recommendations reads: the profile buckets, the plan fields
+    # RetirementService._resolve_inputs uses, the portfolio and the title sets
+    inputs = orjson.dumps(
+        [
+            user.personal_info, user.income, user.expenses, user.assets, user.liabilities, user.risk,
+            getattr(plan, "id", None), getattr(plan, "startAge", None), getattr(plan, "endAge", None),
+            getattr(plan, "planOverrides", None),
+            portfolio,
+        ],
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    )
+    return (str(user.id), inputs, tuple(sorted(goals_lc)), tuple(sorted(actions_lc)))
+
+
+def _result_memo_get(key: tuple) -> list[dict] | None:
+    entry = _result_memo.get(key)
+    if entry is None:
+        return None
+    stored_at, data = entry
+    if time.time() - stored_at > RESULT_MEMO_TTL:
+        del _result_memo[key]
+        return None
+    _result_memo.move_to_end(key)
+    return copy.deepcopy(list(data))
+
+
+def _result_memo_put(key: tuple, data: list[dict]) -> None:
+    _result_memo[key] = (time.time(), tuple(copy.deepcopy(data)))
+    _result_memo.move_to_end(key)
+    while len(_result_memo) > RESULT_MEMO_MAX_ENTRIES:
+        _result_memo.popitem(last=False)
+
+
+def _result_memo_drop_user(user_id: str) -> None:
+    for key in [k for k in _result_memo if k[0] == user_id]:
+        del _result_memo[key]
+
+
+# Forced AI refreshes are queued on every plan save; collapse bursts per user so a
+# run of saves costs one provider call. A skipped refresh still invalidates the user's
+# cached results, so the next dashboard load regenerates from the latest inputs
+# instead of serving a near-duplicate of the advice the last refresh produced.
+AI_REFRESH_DEBOUNCE = 60  # seconds
+_last_ai_refresh: Dict[str, float] = {}
+
+
+# Numeric profile fields, grouped by bucket, coerced in one pass per bucket with _floats
+_INCOME_KEYS = ("currentIncome", "spouseCurrentIncome", "otherIncomeAmount1", "otherIncomeAmount2", "expectedIncomeGrowth")
+_CONTRIBUTION_KEYS = ("investmentContribution", "retirementAccount401kContribution", "retirementAccountIRAContribution", "retirementAccountRothContribution")
+_BALANCE_KEYS = ("savingsBalance", "checkingBalance", "investmentBalance", "realEstateValue",
+                 "retirementAccount401k", "retirementAccountIRA", "retirementAccountRoth", "hsaBalance")
+_LIABILITY_KEYS = ("mortgageBalance", "creditCardDebt", "studentLoanDebt", "otherDebt",
+                   "mortgageRate", "mortgagePayment", "mortgageYearsLeft")
+_PERSONAL_KEYS = ("currentAge", "targetRetirementAge", "dependents")
+
+
+def _f(v: Any) -> float:
+    # The profile's float(x or 0): missing/None/""/0 all count as 0.0
+    return float(v) if v else 0.0
+
+
+def _floats(d: Dict[str, Any], keys: Tuple[str, ...]) -> List[float]:
+    # _f(d.get(key)) for every key, driven by map() rather than a Python-level loop
+    return list(map(_f, map(d.get, keys)))
+
+
+def _stocks_pct(allocation: Dict[str, Any]) -> float:
+    # Nearly every allocation has the full path, so index straight in and only pay
+    # for the fallback when it's missing
+    try:
+        return allocation["categories"]["stocks"]["percentage"]
+    except (KeyError, TypeError):
+        return 60
+
+# --- Rule-based recommendation builders (shared by the single-user and batch paths) ---
+# The static part of each recommendation is a module-level template (a read-only proxy, so a
+# stray write can't leak into every later recommendation); builders copy it, including its
+# nested "data" dict, via _from_template and fill in only the dynamic fields. Goal "data"
+# carries per-user values and is built per call.
+
+_REC_SAVINGS_HIGH = MappingProxyType({
+    "id": "rec_savings_rate_high",
+    "title": "Boost Your Savings Rate",
+    "category": "saving",
+    "impact": "high",
+    "status": "active",
+    "actionType": "ACTION",
+    "data": {"actionCategory": "budget"}
+})
+_DESC_SAVINGS_HIGH = "Your current savings rate is {rate}%. Aiming for at least 15% is recommended for long-term security."
+
+_REC_SAVINGS_MED = MappingProxyType({
+    "id": "rec_savings_rate_med",
+    "title": "Increase Savings to 20%",
+    "description": "You are doing well, but increasing your savings rate to 20% would significantly accelerate your timeline.",
+    "category": "saving",
+    "impact": "medium",
+    "status": "active",
+    "actionType": "ACTION",
+    "data": {"actionCategory": "budget"}
+})
+
+_REC_EMERGENCY_FUND = MappingProxyType({
+    "id": "rec_emergency_fund",
+    "title": "Build Emergency Fund",
+    "category": "risk",
+    "impact": "high",
+    "status": "active",
+    "actionType": "GOAL",
+})
+_DESC_EMERGENCY_FUND = "You have {months} months of expenses saved. We recommend keeping 6 months liquid."
+
+_REC_401K_MAX = MappingProxyType({
+    "id": "rec_401k_max",
+    "title": "Maximize 401(k)",
+    "category": "tax",
+    "impact": "medium",
+    "status": "active",
+    "actionType": "GOAL",
+})
+_DESC_401K_MAX = "You are contributing ${amount:,} annually. Consider increasing up to the $23,000 IRS limit."
+
+_REC_ALLOCATION_CONSERVATIVE = MappingProxyType({
+    "id": "rec_allocation_conservative",
+    "title": "Portfolio Too Conservative?",
+    "category": "investing",
+    "impact": "medium",
+    "status": "active",
+    "actionType": "ACTION",
+    "data": {"actionCategory": "investment"}
+})
+_DESC_ALLOCATION_CONSERVATIVE = "Your stock allocation is {current}%, but based on your age, you might consider closer to {target}% for growth."
+
+_REC_ALLOCATION_AGGRESSIVE = MappingProxyType({
+    "id": "rec_allocation_aggressive",
+    "title": "Portfolio Too Aggressive?",
+    "category": "risk",
+    "impact": "high",
+    "status": "active",
+    "actionType": "ACTION",
+    "data": {"actionCategory": "investment"}
+})
+_DESC_ALLOCATION_AGGRESSIVE = "Your stock allocation is {current}%, which exposes you to high volatility. A target of {target}% is standard for your age."
+
+_REC_BENEFICIARIES = MappingProxyType({
+    "id": "rec_beneficiaries",
+    "title": "Review Beneficiaries",
+    "description": "Ensure your retirement accounts and insurance policies have up-to-date beneficiary designations.",
+    "category": "estate",
+    "impact": "info",
+    "status": "active",
+    "actionType": "ACTION",
+    "data": {"actionCategory": "legal"}
+})
+
+
+def _from_template(template) -> Dict[str, Any]:
+    # Every emitted recommendation owns its dicts, so callers (and the result memo) can't
+    # see each other's writes through a shared template
+    rec = dict(template)
+    data = rec.get("data")
+    if data is not None:
+        rec["data"] = dict(data)
+    return rec
+
+def _rec_savings_high(savings_rate: float) -> Dict[str, Any]:
+    rec = _from_template(_REC_SAVINGS_HIGH)
+    rec["description"] = _DESC_SAVINGS_HIGH.format(rate=int(savings_rate))
+    return rec
+
+def _rec_savings_med() -> Dict[str, Any]:
+    return _from_template(_REC_SAVINGS_MED)
+
+def _rec_emergency_fund(current_value: float, target_value: float, months_covered: float) -> Dict[str, Any]:
+    rec = dict(_REC_EMERGENCY_FUND)
+    rec["description"] = _DESC_EMERGENCY_FUND.format(months=int(months_covered))
+    rec["data"] = {
+        "goalType": "EMERGENCY_FUND",
+        "currentValue": current_value,
+        "targetValue": target_value,
+        "icon": "Shield",
+        "goalCategory": "savings"
+    }
+    return rec
+
+def _rec_401k_max(annual_401k: float, target_401k: float) -> Dict[str, Any]:
+    rec = dict(_REC_401K_MAX)
+    rec["description"] = _DESC_401K_MAX.format(amount=int(annual_401k))
+    rec["data"] = {
+        "goalType": "RETIREMENT_401K",
+        "currentValue": annual_401k,
+        "targetValue": target_401k,
+        "icon": "TrendingUp",
+        "goalCategory": "retirement"
+    }
+    return rec
+
+def _rec_allocation_conservative(current_stocks: float, target_stock_pct: int) -> Dict[str, Any]:
+    rec = _from_template(_REC_ALLOCATION_CONSERVATIVE)
+    rec["description"] = _DESC_ALLOCATION_CONSERVATIVE.format(current=current_stocks, target=target_stock_pct)
+    return rec
+
+def _rec_allocation_aggressive(current_stocks: float, target_stock_pct: int) -> Dict[str, Any]:
+    rec = _from_template(_REC_ALLOCATION_AGGRESSIVE)
+    rec["description"] = _DESC_ALLOCATION_AGGRESSIVE.format(current=current_stocks, target=target_stock_pct)
+    return rec
+
+def _rec_beneficiaries() -> Dict[str, Any]:
+    return _from_template(_REC_BENEFICIARIES)
+
+
 class RecommendationEngine:
     @staticmethod
-    def generate_recommendations(
+    async def generate_recommendations(
         user: User, 
         plan: RetirementPlan, 
         current_portfolio_allocation: Dict[str, Any],
-        active_goal_titles: List[str] = [],
-        active_action_titles: List[str] = []
+        active_goal_titles: Sequence[str] = (),
+        active_action_titles: Sequence[str] = (),
+        force_refresh: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Analyzes the user's financial profile to generate actionable recommendations.
 
+        force_refresh skips the result memo and asks the AI service for new suggestions
+        (bypassing its cache), then stores them under the usual keys.
+
         Returns:
             List[Dict]: A list of recommendation objects containing title, description, impact, actionType, and data.
         """
-        recommendations = []
+        recommendations: List[Dict[str, Any]] = []
+        recommendations_append = recommendations.append
         
-        # Helper for case-insensitive exact & loose match
-        def is_title_present(target_title: str, title_list: List[str]) -> bool:
-            if not title_list:
-                return False
-            target = target_title.lower()
-            # Check for exact match first (case-insensitive)
-            # User asked for "full title, case insensitive" logic. 
-            # But earlier "Emergency Fund" checking was loose. 
-            # Let's support both: if the goal title IS the target, OR if it's very likely the same thing.
-            # Actually user said: "modify this logic to match the full tiltle, still case insenstive."
-            # So stricter is better.
-            return any(t.lower() == target for t in title_list)
-
-        # Helper for safer retrieval
-        def get_d(category, key, default=0):
-            d = getattr(user, category, {}) or {}
-            return float(d.get(key) or 0)
+        # Full title, case-insensitive: lowercase each title list once, then every
+        # "already has it?" check is a set lookup
+        goals_lc = frozenset(t.lower() for t in active_goal_titles)
+        actions_lc = frozenset(t.lower() for t in active_action_titles)
+
+        memo_key = _fingerprint(user, plan, current_portfolio_allocation, goals_lc, actions_lc)
+        if not force_refresh:
+            cached = _result_memo_get(memo_key)
+            if cached is not None:
+                return cached
+
+        # Which rules are still open for this user; sections for rules they've already
+        # acted on are skipped entirely (no savings math, no EF calc, no allocation lookup)
+        need_savings = _T_SAVINGS not in actions_lc
+        # The EF recommendation title is "Build Emergency Fund", so the created goal uses that title.
+        # If they added it as a goal -> invisible. If they added it as an action -> invisible.
+        need_ef = not (_T_EF in goals_lc or _T_BUILD_EF in goals_lc or _T_BUILD_EF in actions_lc)
+        need_401k = not (_T_MAX_401K_A in goals_lc or _T_MAX_401K_B in goals_lc)
+        need_alloc = not (_T_CONS in actions_lc or _T_AGG in actions_lc)
+        need_ben = _T_BEN not in actions_lc
+
+        # Pull the figures the rules use out of the profile dicts once, up front
+        income, spouse = _floats(user.income or {}, _INCOME_KEYS[:2])
+        inv, k401, ira, roth = _floats(user.assets or {}, _CONTRIBUTION_KEYS)
+        monthly_expenses = _f((user.expenses or {}).get("totalMonthlyExpenses")) or 4000
+        age: int = (user.personal_info or {}).get("currentAge") or 30
 
         # 1. Savings Rate Analysis
-        monthly_income = (get_d("income", "currentIncome") + get_d("income", "spouseCurrentIncome")) / 12
-        monthly_savings = (
-            get_d("assets", "investmentContribution") + 
-            get_d("assets", "retirementAccount401kContribution") + 
-            get_d("assets", "retirementAccountIRAContribution") + 
-            get_d("assets", "retirementAccountRothContribution")
-        ) / 12
-        
-        savings_rate = (monthly_savings / monthly_income * 100) if monthly_income > 0 else 0
-        
         # Check against actions too
-        rec_savings_title = "Boost Your Savings Rate"
-        if not is_title_present(rec_savings_title, active_action_titles):
+        if need_savings:
+            # Whole percent, floored (the /12 for monthly figures cancels out); the
+            # thresholds and the message only ever use the integer part
+            annual_income = income + spouse
+            savings_rate = int((inv + k401 + ira + roth) * 100 // annual_income) if annual_income > 0 else 0
+
             if savings_rate < 15:
-                recommendations.append({
-                    "id": "rec_savings_rate_high",
-                    "title": rec_savings_title,
-                    "description": f"Your current savings rate is {int(savings_rate)}%. Aiming for at least 15% is recommended for long-term security.",
-                    "category": "saving",
-                    "impact": "high",
-                    "status": "active",
-                    "actionType": "ACTION",
-                    "data": {"actionCategory": "budget"}
-                })
+                recommendations_append(_rec_savings_high(savings_rate))
             elif savings_rate < 20:
                  # Check alternate title
-                 rec_savings_med = "Increase Savings to 20%"
-                 if not is_title_present(rec_savings_med, active_action_titles):
-                    recommendations.append({
-                        "id": "rec_savings_rate_med",
-                        "title": rec_savings_med,
-                        "description": "You are doing well, but increasing your savings rate to 20% would significantly accelerate your timeline.",
-                        "category": "saving",
-                        "impact": "medium",
-                        "status": "active",
-                        "actionType": "ACTION",
-                        "data": {"actionCategory": "budget"}
-                    })
+                 if _T_SAVINGS_MED not in actions_lc:
+                    recommendations_append(_rec_savings_med())
             
         # 2. Emergency Fund Analysis
-        # Check if user already has an Emergency Fund goal OR action
-        # If they added it as a goal -> invisible. If they added it as an action -> invisible.
-        ef_title = "Emergency Fund"
-        # The recommendation title is "Build Emergency Fund", so the created goal uses that title.
-        has_ef_goal = is_title_present("Emergency Fund", active_goal_titles) or \
-                      is_title_present("Build Emergency Fund", active_goal_titles) or \
-                      is_title_present("Build Emergency Fund", active_action_titles)
-        
-        if not has_ef_goal:
+        # Skipped if user already has an Emergency Fund goal OR action
+        if need_ef:
             # Calculate what the goal SHOULD be
-            from app.services.goal_calculator import GoalCalculator
-            ef_values = GoalCalculator.calculate_initial_values(user, "EMERGENCY_FUND")
+            ef_values = GoalCalculator.calculate_initial_values(user, GoalType.EMERGENCY_FUND)
             
             # Logic: If current < target, recommend it
             if ef_values["currentValue"] < ef_values["targetValue"]:
-                 monthly_exp = get_d("expenses", "totalMonthlyExpenses")
-                 if monthly_exp == 0: monthly_exp = 4000
-                 months_covered = ef_values["currentValue"] / monthly_exp
-                 recommendations.append({
-                    "id": "rec_emergency_fund",
-                    "title": "Build Emergency Fund",
-                    "description": f"You have {int(months_covered)} months of expenses saved. We recommend keeping 6 months liquid.",
-                    "category": "risk",
-                    "impact": "high",
-                    "status": "active",
-                    "actionType": "GOAL",
-                    "data": {
-                        "goalType": "EMERGENCY_FUND",
-                        "currentValue": ef_values["currentValue"],
-                        "targetValue": ef_values["targetValue"],
-                        "icon": "Shield",
-                        "goalCategory": "savings"
-                    }
-                })
+                 months_covered = int(ef_values["currentValue"] // monthly_expenses)
+                 recommendations_append(_rec_emergency_fund(ef_values["currentValue"], ef_values["targetValue"], months_covered))
             
         # 3. 401k Contribution Analysis
         # Recommended Title: "Maximize 401(k)"
         # Note: Titles are matched loosely in filtering, so "Maximize 401(k)" is fine.
-        has_401k_goal = is_title_present("Max 401(k)", active_goal_titles) or \
-                        is_title_present("Maximize 401(k)", active_goal_titles)
-        
-        if not has_401k_goal:
-            annual_401k = get_d("assets", "retirementAccount401kContribution")
+        if need_401k:
             target_401k = 23000.0
-            if annual_401k < target_401k and annual_401k > 0:
-                 recommendations.append({
-                    "id": "rec_401k_max",
-                    "title": "Maximize 401(k)",
-                    "description": f"You are contributing ${int(annual_401k):,} annually. Consider increasing up to the $23,000 IRS limit.",
-                    "category": "tax",
-                    "impact": "medium",
-                    "status": "active",
-                    "actionType": "GOAL",
-                    "data": {
-                        "goalType": "RETIREMENT_401K",
-                        "currentValue": annual_401k,
-                        "targetValue": target_401k,
-                        "icon": "TrendingUp",
-                        "goalCategory": "retirement"
-                    }
-                })
+            if k401 < target_401k and k401 > 0:
+                 recommendations_append(_rec_401k_max(k401, target_401k))
             
         # 4. Asset Allocation Check
-        rec_conservative_title = "Portfolio Too Conservative?"
-        rec_aggressive_title = "Portfolio Too Aggressive?"
-        
-        # Check against ACTIONS
-        has_alloc_action = is_title_present(rec_conservative_title, active_action_titles) or \
-                           is_title_present(rec_aggressive_title, active_action_titles)
-
-        if not has_alloc_action:
-            current_age = (user.personal_info or {}).get("currentAge") or 30
-            target_stock_pct = 110 - current_age
-            current_stocks = current_portfolio_allocation.get("categories", {}).get("stocks", {}).get("percentage", 60)
+        # Checked against ACTIONS
+        if need_alloc:
+            target_stock_pct = 110 - age
+            current_stocks = _stocks_pct(current_portfolio_allocation)
             
             if current_stocks < (target_stock_pct - 15):
-                 recommendations.append({
-                    "id": "rec_allocation_conservative",
-                    "title": rec_conservative_title,
-                    "description": f"Your stock allocation is {current_stocks}%, but based on your age, you might consider closer to {target_stock_pct}% for growth.",
-                    "category": "investing",
-                    "impact": "medium",
-                    "status": "active",
-                    "actionType": "ACTION", 
-                    "data": {"actionCategory": "investment"}
-                })
+                 recommendations_append(_rec_allocation_conservative(current_stocks, target_stock_pct))
             elif current_stocks > (target_stock_pct + 15):
-                 recommendations.append({
-                    "id": "rec_allocation_aggressive",
-                    "title": rec_aggressive_title,
-                    "description": f"Your stock allocation is {current_stocks}%, which exposes you to high volatility. A target of {target_stock_pct}% is standard for your age.",
-                    "category": "risk",
-                    "impact": "high",
-                    "status": "active",
-                    "actionType": "ACTION",
-                    "data": {"actionCategory": "investment"}
-                })
+                 recommendations_append(_rec_allocation_aggressive(current_stocks, target_stock_pct))
 
         # 5. Review Beneficiaries (Static Action Recommendation)
-        rec_ben_title = "Review Beneficiaries"
-        if not is_title_present(rec_ben_title, active_action_titles):
-            recommendations.append({
-                 "id": "rec_beneficiaries",
-                 "title": rec_ben_title,
-                 "description": "Ensure your retirement accounts and insurance policies have up-to-date beneficiary designations.",
-                 "category": "estate",
-                 "impact": "info",
-                 "status": "active",
-                 "actionType": "ACTION",
-                 "data": {"actionCategory": "legal"}
-            })
+        if need_ben:
+            recommendations_append(_rec_beneficiaries())
 
         # --- AI Integration ---
         try:
             from app.services.ai_service import AIService
             
-            # Prepare context
-            # Prepare detailed context
-            # Helper for strings
-            def get_s(cat, key): return (getattr(user, cat, {}) or {}).get(key)
-
-            user_profile = {
-                "demographics": {
-                    "age": get_d("personal_info", "currentAge"),
-                    "retirementAge": get_d("personal_info", "targetRetirementAge"),
-                    "location": get_s("personal_info", "currentLocation") or "US",
-                    "maritalStatus": get_s("personal_info", "maritalStatus"),
-                    "dependents": int(get_d("personal_info", "dependents")),
-                    "riskTolerance": get_s("risk", "riskTolerance")
-                },
-                "income": {
-                    "user": get_d("income", "currentIncome"),
-                    "spouse": get_d("income", "spouseCurrentIncome"),
-                    "other1": {"source": get_s("income", "otherIncomeSource1"), "amount": get_d("income", "otherIncomeAmount1")},
-                    "other2": {"source": get_s("income", "otherIncomeSource2"), "amount": get_d("income", "otherIncomeAmount2")},
-                    "growthRate": get_d("income", "expectedIncomeGrowth")
-                },
-                "assets": {
-                    "savings": get_d("assets", "savingsBalance"),
-                    "checking": get_d("assets", "checkingBalance"),
-                    "investments": get_d("assets", "investmentBalance"),
-                    "realEstate": get_d("assets", "realEstateValue"),
-                    "401k": get_d("assets", "retirementAccount401k"),
-                    "ira": get_d("assets", "retirementAccountIRA"),
-                    "roth": get_d("assets", "retirementAccountRoth"),
-                    "hsa": get_d("assets", "hsaBalance")
-                },
-                "contributions_monthly": {
-                    "savings": get_d("assets", "investmentContribution") / 12, # Assuming this is general investment
-                    "401k": get_d("assets", "retirementAccount401kContribution") / 12,
-                    "ira": get_d("assets", "retirementAccountIRAContribution") / 12,
-                    "roth": get_d("assets", "retirementAccountRothContribution") / 12
-                },
-                "liabilities": {
-                    "mortgage": {
-                        "balance": get_d("liabilities", "mortgageBalance"),
-                        "rate": get_d("liabilities", "mortgageRate"),
-                        "payment": get_d("liabilities", "mortgagePayment"),
-                        "yearsLeft": int(get_d("liabilities", "mortgageYearsLeft"))
-                    },
-                    "creditCards": get_d("liabilities", "creditCardDebt"),
-                    "studentLoans": get_d("liabilities", "studentLoanDebt"),
-                    "otherDebt": get_d("liabilities", "otherDebt")
-                },
-                "expenses": {
-                    "monthlyTotal": get_d("expenses", "totalMonthlyExpenses"),
-                    "breakdown": (user.expenses or {}).get("breakdown", []) 
-                }
-            }
-            
-            from app.services.retirement_service import RetirementService
-            inputs = RetirementService._resolve_inputs(plan, user)
-
-            current_net_worth = (
-                get_d("assets", "savingsBalance") + 
-                get_d("assets", "checkingBalance") + 
-                get_d("assets", "investmentBalance") + 
-                get_d("assets", "realEstateValue") + 
-                get_d("assets", "retirementAccount401k") + 
-                get_d("assets", "retirementAccountIRA") + 
-                get_d("assets", "retirementAccountRoth") + 
-                get_d("assets", "hsaBalance")
-            ) - (
-                get_d("liabilities", "mortgageBalance") + 
-                get_d("liabilities", "creditCardDebt") + 
-                get_d("liabilities", "studentLoanDebt") + 
-                get_d("liabilities", "otherDebt")
-            )
-
-            plan_summary = {
-                "retirementAge": inputs["retirementAge"],
-                "lifeExpectancy": inputs["endAge"], # or user.lifeExpectancy? inputs['endAge'] comes from plan/overrides
-                "targetSpending": inputs["desiredAnnualRetirementSpending"],
-                "currentNetWorth": current_net_worth,
-                "portfolio": current_portfolio_allocation
-            }
+            user_profile, plan_summary = RecommendationEngine._build_ai_context(user, plan, current_portfolio_allocation)
             
             # We need to pass simple lists of strings for context
             # Ideally we pass full objects but titles are sufficient for "don't duplicate" context
             goals_ctx = [{"title": t} for t in active_goal_titles]
             actions_ctx = [{"title": t} for t in active_action_titles]
             
-            ai_recs = AIService.generate_financial_advice(
+            ai_recs = await AIService.generate_financial_advice(
                 user_profile,
                 plan_summary,
                 goals_ctx,
                 actions_ctx,
                 recommendations, # Existing rule-based ones
-                user_id=str(user.id)
+                user_id=str(user.id),
+                force_refresh=force_refresh,
+                raise_errors=True # so a failed LLM call isn't memoized as "no AI suggestions"
             )
             
             # Filter AI Recs (Double Check)
+            # Titles already in the list, kept up to date as AI recs are added
+            existing_titles_lc = {r["title"].lower() for r in recommendations}
             for rec in ai_recs:
                 # Check uniqueness against Goals, Actions, AND existing Recommendations
+                title_lc = rec["title"].lower()
                 is_duplicate = (
-                    is_title_present(rec["title"], active_goal_titles) or
-                    is_title_present(rec["title"], active_action_titles) or
-                    any(r["title"] == rec["title"] for r in recommendations)
+                    title_lc in goals_lc or
+                    title_lc in actions_lc or
+                    title_lc in existing_titles_lc
                 )
                 
                 if not is_duplicate:
-                    recommendations.append(rec)
+                    recommendations_append(rec)
+                    existing_titles_lc.add(title_lc)
                     
         except Exception as e:
             # Fail silently on AI, fallback to rules
-            print(f"AI Integration Error: {e}")
+            logger.warning(f"AI Integration Error: {e}")
+            # Don't memoize the rules-only fallback; the next load should retry the AI
+            return recommendations
 
+        _result_memo_put(memo_key, recommendations)
         return recommendations
 
     @staticmethod
-    def trigger_ai_refresh(
+    def generate_recommendations_batch(
+        users: List[User],
+        portfolio_allocations: List[Dict[str, Any]],
+        active_goal_titles: List[List[str]],
+        active_action_titles: List[List[str]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Rule-based recommendations for many users at once (e.g. a nightly recompute).
+
+        Same rules, order and output as generate_recommendations, without the AI step.
+        User fields are pulled into numpy columns once, every rule becomes a boolean
+        mask over all users, and dicts are only built for the rows a rule fires on.
+
+        Returns:
+            List[List[Dict]]: one recommendation list per user, in input order.
+        """
+        n = len(users)
+        if n == 0:
+            return []
+
+        def col(category: str, key: str) -> np.ndarray:
+            return np.fromiter(
+                (_f((getattr(u, category, {}) or {}).get(key)) for u in users),
+                dtype=float, count=n
+            )
+
+        # 1. Savings rate: whole percent floored from the annual sums, as in the single-user path
+        annual_income = col("income", "currentIncome") + col("income", "spouseCurrentIncome")
+        contrib_401k = col("assets", "retirementAccount401kContribution")
+        annual_savings = (
+            col("assets", "investmentContribution") +
+            contrib_401k +
+            col("assets", "retirementAccountIRAContribution") +
+            col("assets", "retirementAccountRothContribution")
+        )
+        safe_income = np.where(annual_income > 0, annual_income, 1.0)
+        savings_rate = np.where(annual_income > 0, np.floor_divide(annual_savings * 100, safe_income), 0.0)
+
+        # 2. Emergency fund (same numbers as GoalCalculator's EMERGENCY_FUND values)
+        cash = col("assets", "savingsBalance") + col("assets", "checkingBalance")
+        monthly_exp = col("expenses", "totalMonthlyExpenses")
+        monthly_exp[monthly_exp == 0] = 4000.0
+        ef_target = monthly_exp * 6
+
+        # 4. Allocation; raw values are kept for the descriptions so they format as before
+        ages_raw = [(u.personal_info or {}).get("currentAge") or 30 for u in users]
+        stocks_raw = [_stocks_pct(a) for a in portfolio_allocations]
+        target_stock = 110 - np.array(ages_raw, dtype=float)
+        stocks = np.array(stocks_raw, dtype=float)
+
+        # Title suppression (case-insensitive exact match, as in the single-user path)
+        goals_lc = [frozenset(t.lower() for t in titles) for titles in active_goal_titles]
+        actions_lc = [frozenset(t.lower() for t in titles) for titles in active_action_titles]
+
+        def flags(pred) -> np.ndarray:
+            return np.fromiter((pred(g, a) for g, a in zip(goals_lc, actions_lc)), dtype=bool, count=n)
+
+        need_savings = flags(lambda g, a: _T_SAVINGS not in a)
+        need_savings_med = flags(lambda g, a: _T_SAVINGS_MED not in a)
+        need_ef = flags(lambda g, a: not (_T_EF in g or _T_BUILD_EF in g or _T_BUILD_EF in a))
+        need_401k = flags(lambda g, a: not (_T_MAX_401K_A in g or _T_MAX_401K_B in g))
+        need_alloc = flags(lambda g, a: not (_T_CONS in a or _T_AGG in a))
+        need_ben = flags(lambda g, a: _T_BEN not in a)
+
+        # Rules run in the single-user order, so each user's list comes out in the same order
+        results: List[List[Dict[str, Any]]] = [[] for _ in range(n)]
+
+        for i in np.flatnonzero(need_savings & (savings_rate < 15)):
+            results[i].append(_rec_savings_high(int(savings_rate[i])))
+        for i in np.flatnonzero(need_savings & need_savings_med & (savings_rate >= 15) & (savings_rate < 20)):
+            results[i].append(_rec_savings_med())
+
+        for i in np.flatnonzero(need_ef & (cash < ef_target)):
+            results[i].append(_rec_emergency_fund(float(cash[i]), float(ef_target[i]), int(cash[i] // monthly_exp[i])))
+
+        target_401k = 23000.0
+        for i in np.flatnonzero(need_401k & (contrib_401k > 0) & (contrib_401k < target_401k)):
+            results[i].append(_rec_401k_max(float(contrib_401k[i]), target_401k))
+
+        too_low = stocks < (target_stock - 15)
+        too_high = ~too_low & (stocks > (target_stock + 15))
+        for i in np.flatnonzero(need_alloc & too_low):
+            results[i].append(_rec_allocation_conservative(stocks_raw[i], 110 - ages_raw[i]))
+        for i in np.flatnonzero(need_alloc & too_high):
+            results[i].append(_rec_allocation_aggressive(stocks_raw[i], 110 - ages_raw[i]))
+
+        for i in np.flatnonzero(need_ben):
+            results[i].append(_rec_beneficiaries())
+
+        return results
+
+    @staticmethod
+    def _build_ai_context(
+        user: User,
+        plan: RetirementPlan,
+        current_portfolio_allocation: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Builds the (user_profile, plan_summary) context sent to the AI service.
+        """
+        from app.services.retirement_service import RetirementService
+
+        personal = user.personal_info or {}
+        income = user.income or {}
+        assets = user.assets or {}
+        liabilities = user.liabilities or {}
+        expenses = user.expenses or {}
+
+        age, retirement_age, dependents = _floats(personal, _PERSONAL_KEYS)
+        user_income, spouse_income, other1, other2, growth = _floats(income, _INCOME_KEYS)
+        savings, checking, investments, real_estate, k401, ira, roth, hsa = _floats(assets, _BALANCE_KEYS)
+        inv_c, k401_c, ira_c, roth_c = _floats(assets, _CONTRIBUTION_KEYS)
+        mortgage, credit_cards, student_loans, other_debt, mortgage_rate, mortgage_payment, mortgage_years = _floats(liabilities, _LIABILITY_KEYS)
+
+        user_profile = {
+            "demographics": {
+                "age": age,
+                "retirementAge": retirement_age,
+                "location": personal.get("currentLocation") or "US",
+                "maritalStatus": personal.get("maritalStatus"),
+                "dependents": int(dependents),
+                "riskTolerance": (user.risk or {}).get("riskTolerance")
+            },
+            "income": {
+                "user": user_income,
+                "spouse": spouse_income,
+                "other1": {"source": income.get("otherIncomeSource1"), "amount": other1},
+                "other2": {"source": income.get("otherIncomeSource2"), "amount": other2},
+                "growthRate": growth
+            },
+            "assets": {
+                "savings": savings,
+                "checking": checking,
+                "investments": investments,
+                "realEstate": real_estate,
+                "401k": k401,
+                "ira": ira,
+                "roth": roth,
+                "hsa": hsa
+            },
+            "contributions_monthly": {
+                "savings": inv_c / 12, # Assuming this is general investment
+                "401k": k401_c / 12,
+                "ira": ira_c / 12,
+                "roth": roth_c / 12
+            },
+            "liabilities": {
+                "mortgage": {
+                    "balance": mortgage,
+                    "rate": mortgage_rate,
+                    "payment": mortgage_payment,
+                    "yearsLeft": int(mortgage_years)
+                },
+                "creditCards": credit_cards,
+                "studentLoans": student_loans,
+                "otherDebt": other_debt
+            },
+            "expenses": {
+                "monthlyTotal": _f(expenses.get("totalMonthlyExpenses")),
+                "breakdown": expenses.get("breakdown", [])
+            }
+        }
+
+        inputs = RetirementService._resolve_inputs(plan, user)
+
+        current_net_worth = (
+            savings + checking + investments + real_estate + k401 + ira + roth + hsa
+        ) - (
+            mortgage + credit_cards + student_loans + other_debt
+        )
+
+        plan_summary = {
+            "retirementAge": inputs["retirementAge"],
+            "lifeExpectancy": inputs["endAge"], # inputs['endAge'] comes from plan/overrides
+            "targetSpending": _f(inputs["desiredAnnualRetirementSpending"]),
+            "currentNetWorth": current_net_worth,
+            "portfolio": current_portfolio_allocation or {}
+        }
+        return user_profile, plan_summary
+
+    @staticmethod
+    def portfolio_allocation(user: User) -> Dict[str, Any]:
+        """
+        Portfolio breakdown shown on the dashboard and fed to the AI context.
+
+        Background refreshes must use this too, or their AI cache key won't match the
+        dashboard's.
+        """
+        assets = user.assets or {}
+
+        def get_asset(k): return float(assets.get(k) or 0)
+
+        # Liquid assets only; real estate is added for the allocation view below
+        portfolio_total = (
+            get_asset("savingsBalance") +
+            get_asset("checkingBalance") +
+            get_asset("investmentBalance") +
+            get_asset("retirementAccount401k") +
+            get_asset("retirementAccountIRA") +
+            get_asset("retirementAccountRoth") +
+            get_asset("hsaBalance") +
+            get_asset("spouseRetirementAccount401k") +
+            get_asset("spouseRetirementAccountIRA") +
+            get_asset("spouseRetirementAccountRoth") +
+            get_asset("spouseHsaBalance")
+        )
+        # Cash: Savings + Checking
+        cash_val = get_asset("savingsBalance") + get_asset("checkingBalance")
+        real_estate_val = get_asset("realEstateValue")
+        investments_val = portfolio_total - cash_val
+
+        # 60/40 Split for investments as placeholder
+        stocks_val = investments_val * 0.6
+        bonds_val = investments_val * 0.4
+
+        total = portfolio_total + real_estate_val
+
+        def pct(val, tot):
+            return int((val / tot * 100)) if tot > 0 else 0
+
+        return {
+            "total": total,
+            "categories": {
+                "stocks": {"percentage": pct(stocks_val, total), "value": stocks_val},
+                "bonds": {"percentage": pct(bonds_val, total), "value": bonds_val},
+                "realEstate": {"percentage": pct(real_estate_val, total), "value": real_estate_val},
+                "cash": {"percentage": pct(cash_val, total), "value": cash_val}
+            }
+        }
+
+    @staticmethod
+    async def load_titles(db: AsyncSession, user_id) -> Tuple[List[str], List[str]]:
+        """
+        (goal titles, action titles) that suppress matching rule-based recommendations.
+
+        Any existing goal or action counts regardless of status, so a deleted one brings
+        its recommendation back. Ordered so the AI cache key is stable across loads.
+        """
+        goals_res = await db.execute(
+            select(UserGoal.title).where(UserGoal.userId == user_id).order_by(UserGoal.title)
+        )
+        actions_res = await db.execute(
+            select(UserActionItem.title).where(UserActionItem.user_id == user_id).order_by(UserActionItem.title)
+        )
+        return goals_res.scalars().all(), actions_res.scalars().all()
+
+    @staticmethod
+    async def trigger_ai_refresh(
         user: User, 
         plan: RetirementPlan, 
         active_goal_titles: List[str],
         active_action_titles: List[str],
-        current_portfolio_allocation: Dict[str, Any] = {}
+        current_portfolio_allocation: Optional[Dict[str, Any]] = None
     ):
         """
         Background task to force refresh AI recommendations.
+
+        Goes through generate_recommendations with force_refresh, so the AI call is made
+        with exactly the context (profile, plan, titles, portfolio and rule-based recs) the
+        dashboard hashes, and the fresh result lands under the key the dashboard reads.
+        Callers must pass the titles from load_titles and the allocation from
+        portfolio_allocation, as the dashboard does. Only the primary plan is refreshed,
+        since that is the one the dashboard reads.
+
+        Runs via FastAPI BackgroundTasks, after the response is sent.
         """
-        try:
+        if getattr(plan, "planType", None) != "P":
+            return
+        user_id = str(user.id)
+        now = time.monotonic()
+        last = _last_ai_refresh.get(user_id)
+        if last is not None and now - last < AI_REFRESH_DEBOUNCE:
+            logger.debug("Skipping AI refresh for user %s (refreshed %.0fs ago)", user_id, now - last)
             from app.services.ai_service import AIService
-            
-             # Helper for safer retrieval (duplicate definition because it's static context)
-            def get_d(category, key, default=0):
-                d = getattr(user, category, {}) or {}
-                return float(d.get(key) or 0)
-            def get_s(cat, key): return (getattr(user, cat, {}) or {}).get(key)
-
-            user_profile = {
-                "demographics": {
-                    "age": get_d("personal_info", "currentAge"),
-                    "retirementAge": get_d("personal_info", "targetRetirementAge"),
-                    "location": get_s("personal_info", "currentLocation") or "US",
-                    "maritalStatus": get_s("personal_info", "maritalStatus"),
-                    "dependents": int(get_d("personal_info", "dependents")),
-                    "riskTolerance": get_s("risk", "riskTolerance")
-                },
-                "income": {
-                    "user": get_d("income", "currentIncome"),
-                    "spouse": get_d("income", "spouseCurrentIncome"),
-                    "other1": {"source": get_s("income", "otherIncomeSource1"), "amount": get_d("income", "otherIncomeAmount1")},
-                    "other2": {"source": get_s("income", "otherIncomeSource2"), "amount": get_d("income", "otherIncomeAmount2")},
-                    "growthRate": get_d("income", "expectedIncomeGrowth")
-                },
-                "assets": {
-                    "savings": get_d("assets", "savingsBalance"),
-                    "checking": get_d("assets", "checkingBalance"),
-                    "investments": get_d("assets", "investmentBalance"),
-                    "realEstate": get_d("assets", "realEstateValue"),
-                    "401k": get_d("assets", "retirementAccount401k"),
-                    "ira": get_d("assets", "retirementAccountIRA"),
-                    "roth": get_d("assets", "retirementAccountRoth"),
-                    "hsa": get_d("assets", "hsaBalance")
-                },
-                "contributions_monthly": {
-                    "savings": get_d("assets", "investmentContribution") / 12, # Assuming this is general investment
-                    "401k": get_d("assets", "retirementAccount401kContribution") / 12,
-                    "ira": get_d("assets", "retirementAccountIRAContribution") / 12,
-                    "roth": get_d("assets", "retirementAccountRothContribution") / 12
-                },
-                "liabilities": {
-                    "mortgage": {
-                        "balance": get_d("liabilities", "mortgageBalance"),
-                        "rate": get_d("liabilities", "mortgageRate"),
-                        "payment": get_d("liabilities", "mortgagePayment"),
-                        "yearsLeft": int(get_d("liabilities", "mortgageYearsLeft"))
-                    },
-                    "creditCards": get_d("liabilities", "creditCardDebt"),
-                    "studentLoans": get_d("liabilities", "studentLoanDebt"),
-                    "otherDebt": get_d("liabilities", "otherDebt")
-                },
-                "expenses": {
-                    "monthlyTotal": get_d("expenses", "totalMonthlyExpenses"),
-                    "breakdown": (user.expenses or {}).get("breakdown", []) 
-                }
-            }
-            
-            # Resolve inputs
-            from app.services.retirement_service import RetirementService
-            inputs = RetirementService._resolve_inputs(plan, user)
-            
-            # Recalculate Net Worth
-            current_net_worth = (
-                get_d("assets", "savingsBalance") + 
-                get_d("assets", "checkingBalance") + 
-                get_d("assets", "investmentBalance") + 
-                get_d("assets", "realEstateValue") + 
-                get_d("assets", "retirementAccount401k") + 
-                get_d("assets", "retirementAccountIRA") + 
-                get_d("assets", "retirementAccountRoth") + 
-                get_d("assets", "hsaBalance")
-            ) - (
-                get_d("liabilities", "mortgageBalance") + 
-                get_d("liabilities", "creditCardDebt") + 
-                get_d("liabilities", "studentLoanDebt") + 
-                get_d("liabilities", "otherDebt")
-            )
 
-            plan_summary = {
-                "retirementAge": inputs["retirementAge"],
-                "lifeExpectancy": inputs["endAge"],
-                "targetSpending": float(inputs["desiredAnnualRetirementSpending"] or 0),
-                "currentNetWorth": current_net_worth,
-                "portfolio": current_portfolio_allocation
-            }
-            
-            goals_ctx = [{"title": t} for t in active_goal_titles]
-            actions_ctx = [{"title": t} for t in active_action_titles]
-            
-            # For background refresh, we might pass empty existing recommendations or standard ones?
-            # AI normally filters out existing reccs. If we pass empty, it might suggest things we already have.
-            # Ideally we pass current rule-based ones. 
-            # But calculating them requires calling `generate_recommendations` recursively which is fine.
-            # Let's perform a lightweight call to self.generate_recommendations? No, that requires inputs.
-            # Let's pass empty for now. The deduplication happens at READ time in the engine anyway.
-            # The AI cache serves raw AI ideas. The engine filters them. So passing empty here is acceptable 
-            # as long as the prompt doesn't fail.
-            
-            AIService.generate_financial_advice(
-                user_profile,
-                plan_summary,
-                goals_ctx,
-                actions_ctx,
-                existing_recommendations=[], 
-                user_id=str(user.id),
+            _result_memo_drop_user(user_id)
+            await AIService.invalidate_user_cache(user_id)
+            return
+        _last_ai_refresh[user_id] = now
+        # Drop stale stamps so the dict doesn't grow with every user ever refreshed
+        if len(_last_ai_refresh) > 4096:
+            for uid in [u for u, t in _last_ai_refresh.items() if now - t >= AI_REFRESH_DEBOUNCE]:
+                del _last_ai_refresh[uid]
+
+        # The forced run re-memoizes the current inputs; older entries shouldn't outlive it
+        _result_memo_drop_user(user_id)
+        try:
+            await RecommendationEngine.generate_recommendations(
+                user,
+                plan,
+                current_portfolio_allocation or {},
+                active_goal_titles=active_goal_titles,
+                active_action_titles=active_action_titles,
                 force_refresh=True
             )
         except Exception as e:
-            print(f"Background AI Refresh Failed: {e}")
+            logger.error(f"Background AI Refresh Failed: {e}")
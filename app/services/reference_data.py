@@ -0,0 +1,53 @@
+from typing import Dict, Optional
+
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.investment import RefAccountType, RefFund
+
+
+class ReferenceDataService:
+    """
+    Lookups for the small, static ref_* tables, memoized in a per-request dict
+    (see deps.get_ref_cache) so repeated resolutions within a request hit the DB once.
+    """
+
+    @staticmethod
+    async def get_account_type(db: AsyncSession, cache: dict, *codes: str) -> Optional[RefAccountType]:
+        """
+        Returns the first RefAccountType matching `codes`, in priority order.
+        All candidate codes are fetched in a single query.
+        """
+        types = cache.setdefault(RefAccountType, {})
+        missing = [c for c in codes if c and c not in types]
+        if missing:
+            res = await db.execute(select(RefAccountType).where(RefAccountType.code.in_(missing)))
+            found = {t.code: t for t in res.scalars().all()}
+            for c in missing:
+                types[c] = found.get(c)
+
+        for c in codes:
+            if c and types.get(c):
+                return types[c]
+        return None
+
+    @staticmethod
+    async def get_fund_map(db: AsyncSession, cache: dict) -> Dict[str, RefFund]:
+        """All funds keyed by upper-cased ticker."""
+        fund_map = cache.get(RefFund)
+        if fund_map is None:
+            res = await db.execute(select(RefFund))
+            fund_map = {f.ticker.upper(): f for f in res.scalars().all()}
+            cache[RefFund] = fund_map
+        return fund_map
+
+    @staticmethod
+    async def get_fund(db: AsyncSession, cache: dict, ticker: str) -> Optional[RefFund]:
+        fund_map = cache.get(RefFund)
+        if fund_map is not None:
+            return fund_map.get(ticker.upper())
+
+        funds = cache.setdefault((RefFund, "ticker"), {})
+        if ticker not in funds:
+            funds[ticker] = await db.get(RefFund, ticker)
+        return funds[ticker]
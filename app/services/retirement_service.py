@@ -1,11 +1,15 @@
 import math
 import json
+import operator
+from itertools import accumulate, repeat
 from datetime import datetime
 from decimal import Decimal
 from typing import List, Dict, Any, Optional
 from uuid import UUID
+from uuid6 import uuid7
 
 from sqlmodel import select, delete
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import (
@@ -15,6 +19,7 @@ from app.models import (
     UserMilestone
 )
 from app.models.retirement import RetirementPlanBase
+from app.models.common import utcnow
 from app.services.financial_assumptions_service import FinancialAssumptionsService
 
 class RetirementService:
@@ -92,25 +97,25 @@ class RetirementService:
             res = await self.session.execute(stmt)
             accounts = res.scalars().all()
             
-            # Initialize buckets
+            # Initialize buckets (float accumulators; balances are Decimal only at the DB boundary)
             sync_data = {
-                "retirementAccount401k": Decimal(0),
-                "retirementAccountIRA": Decimal(0),
-                "retirementAccountRoth": Decimal(0),
-                "hsaBalance": Decimal(0),
+                "retirementAccount401k": 0.0,
+                "retirementAccountIRA": 0.0,
+                "retirementAccountRoth": 0.0,
+                "hsaBalance": 0.0,
                 
-                "spouseRetirementAccount401k": Decimal(0),
-                "spouseRetirementAccountIRA": Decimal(0),
-                "spouseRetirementAccountRoth": Decimal(0),
-                "spouseHsaBalance": Decimal(0),
+                "spouseRetirementAccount401k": 0.0,
+                "spouseRetirementAccountIRA": 0.0,
+                "spouseRetirementAccountRoth": 0.0,
+                "spouseHsaBalance": 0.0,
                 
-                "investmentBalance": Decimal(0)
+                "investmentBalance": 0.0
             }
             
             for acc in accounts:
                 code = acc.accountTypeRef.code if acc.accountTypeRef else "other"
                 owner = acc.accountOwner # primary, spouse, joint
-                bal = acc.balance
+                bal = float(acc.balance or 0)
                 
                 # Brokerage (Joint or Primary or Spouse -> all goes to investmentBalance for now as per calc logic)
                 if code in ['brokerage', 'taxable', 'trust', 'custodial']:
@@ -141,9 +146,7 @@ class RetirementService:
                     if target_key in sync_data:
                         sync_data[target_key] += bal
 
-            # Convert to float for overrides
-            for k, v in sync_data.items():
-                portfolio_overrides[k] = float(v)
+            portfolio_overrides.update(sync_data)
 
         # Clear existing data
         await self.clear_plan_data(plan.id)
@@ -304,6 +307,13 @@ class RetirementService:
 
         cumulative_tax = 0.0
 
+        # Rates are plain floats from _resolve_inputs; compound them once up front
+        # instead of re-deriving (1 + r) ** n / (1 + r) every year inside the loop.
+        # inflators[n] == (1 + inflation_rate) ** n
+        inflators = list(accumulate(repeat(1 + inflation_rate, max(end_age - start_age, 0)), operator.mul, initial=1.0))
+        portfolio_growth = 1 + portfolio_growth_rate
+        bond_growth = 1 + bond_growth_rate
+
         # --- LOOP ---
         for age in range(start_age, end_age + 1):
             year = current_year + (age - start_age)
@@ -377,7 +387,7 @@ class RetirementService:
             # --- YEAR 1+: CALCULATIONS ---
             
             # 1. Inflation Adjustments
-            inflator = (1 + inflation_rate) ** years_from_start
+            inflator = inflators[years_from_start]
             
             # 2. Income Sources
             income_salary = 0.0
@@ -824,17 +834,17 @@ class RetirementService:
             
             # Apply Growth
             # 401k balance update (use the sub-balances which now have contributions)
-            user_bal_401k *= (1 + portfolio_growth_rate)
-            spouse_bal_401k *= (1 + portfolio_growth_rate)
+            user_bal_401k *= portfolio_growth
+            spouse_bal_401k *= portfolio_growth
             
-            user_bal_roth *= (1 + portfolio_growth_rate)
-            spouse_bal_roth *= (1 + portfolio_growth_rate)
+            user_bal_roth *= portfolio_growth
+            spouse_bal_roth *= portfolio_growth
             
-            user_bal_hsa *= (1 + portfolio_growth_rate)
-            spouse_bal_hsa *= (1 + portfolio_growth_rate)
+            user_bal_hsa *= portfolio_growth
+            spouse_bal_hsa *= portfolio_growth
 
-            bal_brokerage *= (1 + portfolio_growth_rate)
-            bal_savings *= (1 + bond_growth_rate)
+            bal_brokerage *= portfolio_growth
+            bal_savings *= bond_growth
             
             # Recombine for next loop iteration
             bal_401k = user_bal_401k + spouse_bal_401k
@@ -892,29 +902,41 @@ class RetirementService:
 
         Creates `AnnualSnapshot` records for each year.
         Uses JSONB columns for assets, liabilities, income, and expenses details.
+        All rows go out in a single bulk INSERT instead of one add() per year.
         """
-        for p in projections:
-            snapshot = AnnualSnapshot(
-                planId=plan.id,
-                year=p["year"],
-                age=p["age"],
-                grossIncome=Decimal(p["grossIncome"]),
-                netIncome=Decimal(p["netIncome"]),
-                totalExpenses=Decimal(p["totalExpenses"]),
-                totalAssets=Decimal(p["totalAssets"]),
-                totalLiabilities=Decimal(p["totalLiabilities"]),
-                netWorth=Decimal(p["netWorth"]),
-                taxesPaid=Decimal(p["taxesPaid"]),
-                cumulativeTax=Decimal(p["cumulativeTax"]),
+        if not projections:
+            return
+
+        # Ids and the created timestamp are generated up front for the whole batch
+        # rather than through per-row column defaults during the insert.
+        ids = [uuid7() for _ in range(len(projections))]
+        created_at = utcnow()
+
+        rows = [
+            {
+                "id": snapshot_id,
+                "createdAt": created_at,
+                "planId": plan.id,
+                "year": p["year"],
+                "age": p["age"],
+                "grossIncome": Decimal(p["grossIncome"]),
+                "netIncome": Decimal(p["netIncome"]),
+                "totalExpenses": Decimal(p["totalExpenses"]),
+                "totalAssets": Decimal(p["totalAssets"]),
+                "totalLiabilities": Decimal(p["totalLiabilities"]),
+                "netWorth": Decimal(p["netWorth"]),
+                "taxesPaid": Decimal(p["taxesPaid"]),
+                "cumulativeTax": Decimal(p["cumulativeTax"]),
                 # JSONB Columns
-                assets=p["assets"],
-                liabilities=p["liabilities"],
-                income=p["income"],
-                expenses=p["expenses"]
-            )
-            self.session.add(snapshot)
-            # No need to create child records anymore
-        
+                "assets": p["assets"],
+                "liabilities": p["liabilities"],
+                "income": p["income"],
+                "expenses": p["expenses"],
+            }
+            for snapshot_id, p in zip(ids, projections)
+        ]
+        await self.session.execute(insert(AnnualSnapshot), rows)
+
         await self.session.commit()
 
     async def create_standard_milestones(self, plan: RetirementPlan):
@@ -0,0 +1,36 @@
+from typing import Any, Dict
+
+from sqlalchemy import update, func, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.user import User
+
+
+class UserService:
+    @staticmethod
+    async def merge_profile(db: AsyncSession, user: User, patches: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Merges partial updates into the user's JSONB buckets server-side
+        (`bucket = bucket || patch`) in a single UPDATE, instead of rewriting
+        each whole blob from Python. The merged buckets come back via RETURNING
+        and are set on `user` as already-persisted state. Caller commits.
+        """
+        patches = {col: patch for col, patch in patches.items() if patch}
+        if not patches:
+            return
+
+        stmt = (
+            update(User)
+            .where(User.id == user.id)
+            .values({
+                col: func.coalesce(getattr(User, col), cast({}, JSONB)).op("||")(cast(patch, JSONB))
+                for col, patch in patches.items()
+            })
+            .returning(*(getattr(User, col) for col in patches))
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(stmt)).one()
+        for col, value in zip(patches, row):
+            set_committed_value(user, col, value)
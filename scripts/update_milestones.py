@@ -107,8 +107,8 @@ async def update_milestones():
     # 1. Update Schema
     try:
         async with engine.begin() as conn:
-            print("1. Altering table to support floats (attempting)...")
-            await conn.execute(text("ALTER TABLE ref_milestones ALTER COLUMN target_age TYPE float USING target_age::float"))
+            print("1. Altering table to support half-year ages (attempting)...")
+            await conn.execute(text("ALTER TABLE ref_milestones ALTER COLUMN target_age TYPE numeric(4,1) USING target_age::numeric(4,1)"))
     except Exception as e:
         print(f"Skipping ALTER TABLE (might lack permission or already done): {e}")
 
@@ -0,0 +1,4 @@
+import os
+
+# Settings requires a DATABASE_URL at import time; the unit tests never connect
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/reazy_test")
@@ -0,0 +1,18 @@
+import pytest
+
+from app.services.ai_service import _derive_category
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"goalCategory": "retirement"}, "investing"),
+    ({"goalCategory": "Retirement Savings"}, "investing"),
+    ({"goalCategory": "debt"}, "debt"),
+    ({"goalCategory": "savings"}, "saving"),
+    ({"actionCategory": "investment"}, "investing"),
+    ({"actionCategory": "investments"}, "investing"),
+    ({"actionCategory": "legal/estate"}, "estate"),
+    ({"actionCategory": "budget"}, "saving"),
+    ({}, "saving"),
+])
+def test_derive_category_keeps_substring_matching(data, expected):
+    assert _derive_category(data) == expected
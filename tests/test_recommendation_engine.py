@@ -0,0 +1,225 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.services import ai_service, recommendation_engine
+from app.services.ai_service import AIService
+from app.services.recommendation_engine import RecommendationEngine
+
+
+def make_user(income=None, assets=None, expenses=None, personal_info=None):
+    return SimpleNamespace(
+        id=uuid4(),
+        personal_info=personal_info or {},
+        income=income or {},
+        expenses=expenses or {},
+        assets=assets or {},
+        liabilities={},
+        risk={},
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_memos():
+    recommendation_engine._result_memo.clear()
+    recommendation_engine._last_ai_refresh.clear()
+    ai_service._memo.clear()
+    yield
+    recommendation_engine._result_memo.clear()
+    recommendation_engine._last_ai_refresh.clear()
+    ai_service._memo.clear()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Google provider that records prompts, with the SQLite cache swapped for a dict."""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_PROVIDER", "google")
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", True)
+    monkeypatch.setattr(
+        RecommendationEngine, "_build_ai_context",
+        staticmethod(lambda user, plan, portfolio: ({"assets": user.assets}, {})),
+    )
+
+    disk = {}
+    monkeypatch.setattr(ai_service, "_read_cache_entry", lambda user_id, key: disk.get((user_id, key)))
+    monkeypatch.setattr(
+        ai_service, "_write_cache_entry",
+        lambda user_id, key, data: disk.__setitem__((user_id, key), (0.0, data)),
+    )
+    monkeypatch.setattr(
+        ai_service, "_delete_cache_entries",
+        lambda user_id: [disk.pop(k) for k in list(disk) if k[0] == user_id],
+    )
+
+    calls = []
+
+    async def google(api_key, prompt):
+        calls.append(prompt)
+        return [{"id": f"ai_{len(calls)}", "title": f"AI idea {len(calls)}", "impact": "low",
+                 "actionType": "ACTION", "data": {"actionCategory": "budget"}}]
+
+    monkeypatch.setattr(AIService, "_generate_google", staticmethod(google))
+    return calls
+
+
+def test_ai_provider_failure_is_retried_on_next_load(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "AI_PROVIDER", "google")
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+    # Keep the test off RetirementService; the context content doesn't matter here
+    monkeypatch.setattr(
+        RecommendationEngine, "_build_ai_context",
+        staticmethod(lambda user, plan, portfolio: ({}, {})),
+    )
+
+    calls = []
+
+    async def failing_google(api_key, prompt):
+        calls.append(prompt)
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(AIService, "_generate_google", staticmethod(failing_google))
+
+    user = make_user(income={"currentIncome": 100000})
+    for _ in range(3):
+        recs = asyncio.run(RecommendationEngine.generate_recommendations(user, None, {}))
+        assert recs  # rule-based recommendations still come back
+
+    assert len(calls) == 3
+    assert not recommendation_engine._result_memo
+
+
+PARITY_CASES = [
+    # (user kwargs, portfolio, goal titles, action titles)
+    (
+        dict(income={"currentIncome": 10000}, assets={"investmentContribution": 700}),
+        {"categories": {"stocks": {"percentage": 60}}}, [], [],
+    ),
+    (
+        dict(
+            income={"currentIncome": 90000, "spouseCurrentIncome": 30000},
+            assets={"retirementAccount401kContribution": 12000, "retirementAccountRothContribution": 7000,
+                    "savingsBalance": 9000, "checkingBalance": 2500},
+            expenses={"totalMonthlyExpenses": 5200},
+            personal_info={"currentAge": 58},
+        ),
+        {"categories": {"stocks": {"percentage": 85}}}, [], ["Review Beneficiaries"],
+    ),
+    (
+        dict(
+            income={"currentIncome": 55000},
+            assets={"investmentContribution": 3000, "savingsBalance": 1000},
+            personal_info={"currentAge": 24},
+        ),
+        {}, ["Emergency Fund"], ["portfolio too conservative?"],
+    ),
+    (dict(), {"categories": {"stocks": {"percentage": 20}}}, ["Max 401(k)"], []),
+]
+
+
+def test_batch_matches_single_user_recommendations(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", None)  # rules only
+    monkeypatch.setattr(
+        RecommendationEngine, "_build_ai_context",
+        staticmethod(lambda user, plan, portfolio: ({}, {})),
+    )
+
+    users = [make_user(**kwargs) for kwargs, _, _, _ in PARITY_CASES]
+    portfolios = [portfolio for _, portfolio, _, _ in PARITY_CASES]
+    goals = [g for _, _, g, _ in PARITY_CASES]
+    actions = [a for _, _, _, a in PARITY_CASES]
+
+    batch = RecommendationEngine.generate_recommendations_batch(users, portfolios, goals, actions)
+    single = [
+        asyncio.run(RecommendationEngine.generate_recommendations(
+            user, None, portfolio, active_goal_titles=g, active_action_titles=a
+        ))
+        for user, portfolio, g, a in zip(users, portfolios, goals, actions)
+    ]
+
+    assert batch == single
+    assert batch[0][0]["description"].startswith("Your current savings rate is 7%.")
+
+
+def test_static_recommendations_are_not_shared_between_results():
+    users = [make_user(), make_user()]
+    first, second = RecommendationEngine.generate_recommendations_batch(users, [{}, {}], [[], []], [[], []])
+    ben_a = next(r for r in first if r["id"] == "rec_beneficiaries")
+    ben_b = next(r for r in second if r["id"] == "rec_beneficiaries")
+
+    ben_a["title"] = "mutated"
+    ben_a["data"]["actionCategory"] = "mutated"
+
+    assert ben_b["title"] == "Review Beneficiaries"
+    assert ben_b["data"] == {"actionCategory": "legal"}
+    assert recommendation_engine._REC_BENEFICIARIES["data"] == {"actionCategory": "legal"}
+
+
+def test_memoized_results_are_isolated_from_callers(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", None)  # rules only
+    monkeypatch.setattr(
+        RecommendationEngine, "_build_ai_context",
+        staticmethod(lambda user, plan, portfolio: ({}, {})),
+    )
+    user = make_user(income={"currentIncome": 10000})
+
+    first = asyncio.run(RecommendationEngine.generate_recommendations(user, None, {}))
+    expected = [dict(r, data=dict(r["data"])) for r in first]
+    for rec in first:
+        rec["title"] = "mutated"
+        rec["data"]["mutated"] = True
+
+    second = asyncio.run(RecommendationEngine.generate_recommendations(user, None, {}))
+    assert len(recommendation_engine._result_memo) == 1  # second call was a memo hit
+    assert second == expected
+
+
+def test_background_refresh_warms_what_the_dashboard_reads(fake_llm):
+    user = make_user(income={"currentIncome": 80000}, assets={"savingsBalance": 5000})
+    plan = SimpleNamespace(planType="P")
+    portfolio = {"categories": {"stocks": {"percentage": 60}}}
+    goals, actions = ["Emergency Fund"], ["Review Beneficiaries"]
+
+    asyncio.run(RecommendationEngine.trigger_ai_refresh(user, plan, goals, actions, portfolio))
+    assert len(fake_llm) == 1
+
+    recommendation_engine._result_memo.clear()  # make the dashboard go through the AI service
+    recs = asyncio.run(RecommendationEngine.generate_recommendations(
+        user, plan, portfolio, active_goal_titles=goals, active_action_titles=actions
+    ))
+
+    assert len(fake_llm) == 1  # served from what the refresh cached
+    assert any(r["id"] == "ai_1" for r in recs)
+
+
+def test_background_refresh_skips_plans_the_dashboard_does_not_read(fake_llm):
+    user = make_user(income={"currentIncome": 80000})
+    scenario = SimpleNamespace(planType="S")
+
+    asyncio.run(RecommendationEngine.trigger_ai_refresh(user, scenario, [], [], {}))
+
+    assert fake_llm == []
+    assert str(user.id) not in recommendation_engine._last_ai_refresh
+
+
+def test_debounced_refresh_still_invalidates_cached_results(fake_llm):
+    user = make_user(income={"currentIncome": 80000}, assets={"savingsBalance": 5000})
+    plan = SimpleNamespace(planType="P")
+
+    asyncio.run(RecommendationEngine.trigger_ai_refresh(user, plan, [], [], {}))
+    assert len(fake_llm) == 1
+
+    # Saved again within the debounce window; small enough to hit the near-duplicate tier
+    user.assets = {"savingsBalance": 5010}
+    asyncio.run(RecommendationEngine.trigger_ai_refresh(user, plan, [], [], {}))
+    assert len(fake_llm) == 1  # debounced
+    assert not recommendation_engine._result_memo
+    assert not ai_service._memo
+
+    recs = asyncio.run(RecommendationEngine.generate_recommendations(user, plan, {}))
+    assert len(fake_llm) == 2  # regenerated from the latest inputs
+    assert any(r["id"] == "ai_2" for r in recs)